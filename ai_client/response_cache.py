@@ -0,0 +1,180 @@
+"""Response cache for the LLM wrapper
+This module caches whole answers to prompts, so a repeated prompt is answered without
+calling the OpenAI API. Entries expire after a TTL and the number kept is bounded. The
+storage is a pluggable backend: an in-process LRU by default, a SQLite file that is
+shared by processes and survives restarts, or any object with the ResponseCacheBackend
+methods, such as a wrapper around Redis.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+class ResponseCacheBackend:
+    """
+    The storage behind a ResponseCache.
+
+    Keys and values are strings. A backend must not return a value after its expiry time,
+    and may drop entries early to stay within its size bound.
+    """
+
+    def get(self, key: str) -> str | None:
+        """Returns the value stored for key, or None if there is none or it has expired."""
+        raise NotImplementedError
+
+    def set(self, key: str, value: str, expires: float):
+        """Stores value for key until the wall-clock time expires, as returned by time.time()."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Removes every entry."""
+        raise NotImplementedError
+
+
+class MemoryBackend(ResponseCacheBackend):
+    """A thread-safe, in-process LRU backend."""
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        Args:
+            maxsize (int, optional): Maximum number of entries kept. Defaults to 1024.
+        """
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, expires: float):
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteBackend(ResponseCacheBackend):
+    """A backend in a SQLite file, shared by every process that opens it."""
+
+    def __init__(self, path: str, maxsize: int = 1024):
+        """
+        Args:
+            path (str): Path of the SQLite file.
+            maxsize (int, optional): Maximum number of entries kept. The entries that expire
+                                     soonest are removed first. Defaults to 1024.
+        """
+        self.path = path
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT, expires REAL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_expires ON responses (expires)")
+        self._db.commit()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM responses WHERE key = ? AND expires > ?", (key, time.time())
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def set(self, key: str, value: str, expires: float):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)", (key, value, expires))
+            self._db.execute("DELETE FROM responses WHERE expires <= ?", (time.time(),))
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY expires DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            )
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Normalizes a prompt so that prompts differing only in spacing or a final full stop or
+    question mark share a cache entry.
+
+    Case is kept, since the words in a prompt seed the game by their exact characters.
+
+    Args:
+        prompt (str): The user's input.
+
+    Returns:
+        str: The normalized prompt.
+    """
+    prompt = unicodedata.normalize("NFC", prompt)
+    prompt = re.sub(r"\s+", " ", prompt).strip()
+    return prompt.rstrip(".?! ")
+
+
+class ResponseCache:
+    """
+    A cache of answers to prompts, in front of the LLM.
+
+    Values are JSON-encoded for the backend, and each entry lives for ttl seconds.
+    """
+
+    def __init__(self, backend: ResponseCacheBackend | None = None, ttl: float = 3600):
+        """
+        Args:
+            backend (ResponseCacheBackend | None, optional): Where entries are stored. Defaults to
+                                                             None, for a MemoryBackend of 1024 entries.
+            ttl (float, optional): Seconds an entry lives for. Defaults to 3600.
+        """
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl = ttl
+
+    @staticmethod
+    def key(prompt: str, **context) -> str:
+        """
+        Returns the cache key for a prompt.
+
+        Args:
+            prompt (str): The user's input, normalized with normalize_prompt.
+            **context: Everything else the answer depends on, such as the model and the system
+                       prompts. Values must be JSON-serializable.
+
+        Returns:
+            str: A SHA-256 hex digest of the normalized prompt and the context.
+        """
+        payload = json.dumps({"prompt": normalize_prompt(prompt), **context}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        """Returns the entry stored for key, or None on a miss."""
+        value = self.backend.get(key)
+        return None if value is None else json.loads(value)
+
+    def set(self, key: str, value: dict):
+        """Stores an entry for key, for the cache's ttl."""
+        if self.ttl > 0:
+            self.backend.set(key, json.dumps(value), time.time() + self.ttl)
+
+    def clear(self):
+        self.backend.clear()
@@ -0,0 +1,108 @@
+"""Local prompt router
+This module recognizes the simple prompts that make up most traffic, such as
+"score monument" or "how many generations do 'foo' and 'bar' have?", so they can be
+answered by running the games directly and filling in a template, without the two
+OpenAI round trips. parse_prompt only accepts a prompt that matches one of its shapes
+in full; anything else returns None and goes to the LLM.
+"""
+
+import re
+
+from ai_client.response_cache import normalize_prompt
+
+MAX_ROUTED_WORDS = 20
+# Bare words that stand for something the user wants chosen or explained, not a seed
+PLACEHOLDER_WORDS = {
+    "all", "any", "anything", "each", "every", "everything", "for", "it", "me", "of", "one", "ones",
+    "random", "some", "something", "that", "the", "them", "these", "this", "those", "word", "words",
+}
+
+WORD = r"""(?:'[^']+'|"[^"]+"|“[^”]+”|‘[^’]+’|[A-Za-z0-9_-]+)"""
+SEPARATOR = r"(?:\s*,\s*(?:and\s+)?|\s+and\s+)"
+WORDS = rf"(?P<words>{WORD}(?:{SEPARATOR}{WORD})*)"
+METRIC = r"(?P<metric>(?:scores?|generations?)(?:\s+and\s+(?:scores?|generations?))?)"
+PREFIX = r"(?:(?:please\s+)?(?:what(?:'s|\s+is|\s+are)|get|give\s+me|show\s+me|tell\s+me|find)\s+(?:the\s+)?)?"
+SUBJECT = r"(?:the\s+)?(?:words?\s+)?"
+PROMPT_SHAPES = [
+    # "score monument", "what is the score of 'foo'", "generations and score for foo, bar and baz"
+    re.compile(rf"{PREFIX}{METRIC}(?:\s+(?:for|of))?\s+{SUBJECT}{WORDS}", re.IGNORECASE),
+    # "how many generations does monument have"
+    re.compile(
+        rf"how\s+many\s+(?P<metric>generations)\s+(?:does|do|will|would)\s+{SUBJECT}{WORDS}"
+        rf"\s+(?:have|last|return|get|run(?:\s+for)?)",
+        re.IGNORECASE,
+    ),
+    # "what does monument score"
+    re.compile(rf"what\s+(?:does|do|will|would)\s+{SUBJECT}{WORDS}\s+(?P<metric>score)", re.IGNORECASE),
+]
+WORD_TOKEN = re.compile(rf"({WORD}){SEPARATOR}?")
+QUOTES = {"'": "'", '"': '"', "“": "”", "‘": "’"}
+
+
+def split_words(text: str) -> list[str]:
+    """Splits a matched word list into its words, removing the quotes around quoted words."""
+    words = []
+    for token in WORD_TOKEN.findall(text):
+        if token[0] in QUOTES and token[-1] == QUOTES[token[0]]:
+            token = token[1:-1]
+        words.append(token)
+    return words
+
+
+def parse_prompt(prompt: str) -> tuple[str, list[str]] | None:
+    """
+    Recognizes a prompt that only asks for the scores or generations of some words.
+
+    Args:
+        prompt (str): The user's input.
+
+    Returns:
+        tuple[str, list[str]] | None: What is asked for, one of "score", "generations" or "both",
+            and the words in the order given, or None if the prompt has another shape, names
+            a placeholder such as "it" or "something" rather than a word, or names more than
+            MAX_ROUTED_WORDS words.
+    """
+    prompt = normalize_prompt(prompt)
+    for shape in PROMPT_SHAPES:
+        match = shape.fullmatch(prompt)
+        if match is not None:
+            break
+    else:
+        return None
+
+    metric = match["metric"].lower()
+    if "score" in metric and "generation" in metric:
+        asked = "both"
+    else:
+        asked = "score" if "score" in metric else "generations"
+
+    bare_words = re.sub(r"""'[^']+'|"[^"]+"|“[^”]+”|‘[^’]+’""", " ", match["words"]).lower().split()
+    words = split_words(match["words"])
+    if len(words) > MAX_ROUTED_WORDS or PLACEHOLDER_WORDS.intersection(bare_words):
+        return None
+    return asked, words
+
+
+def format_answer(asked: str, words: list[str], results: list[dict]) -> str:
+    """
+    Formats the answer to a routed prompt, one sentence per word.
+
+    Args:
+        asked (str): What the prompt asked for, as returned by parse_prompt.
+        words (list[str]): The words, as returned by parse_prompt.
+        results (list[dict]): The game result for each word, in the same order.
+
+    Returns:
+        str: The answer.
+    """
+    sentences = []
+    for word, result in zip(words, results):
+        if asked == "score":
+            sentences.append(f'The word "{word}" has a score of {result["score"]}.')
+        elif asked == "generations":
+            sentences.append(f'The word "{word}" runs for {result["generations"]} generations.')
+        else:
+            sentences.append(
+                f'The word "{word}" runs for {result["generations"]} generations and has a score of {result["score"]}.'
+            )
+    return "\n".join(sentences)
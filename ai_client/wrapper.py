@@ -1,16 +1,66 @@
 """AI client wrapper logic
 
 This module provides a wrapper for interacting with the OpenAI API in the context of Conway's Game of Life.
-It defines custom exceptions for server errors and provides a function to handle user input, call the LLM,
-and invoke the game logic as needed.
+It defines custom exceptions for server errors and provides sync and async functions to handle user input,
+call the LLM, and invoke the game logic as needed.
 """
 
+import asyncio
+import functools
 import json
+import os
+import time
+from concurrent.futures import CancelledError, Executor, Future, wait
 from pprint import pprint
-from openai import OpenAI, APIConnectionError, APITimeoutError, AuthenticationError, BadRequestError, InternalServerError, RateLimitError
-from api.cgol import run_game
+from openai import OpenAI, AsyncOpenAI, APIConnectionError, APITimeoutError, AuthenticationError, BadRequestError, InternalServerError, RateLimitError
+from api.cgol import GAME_FLIGHTS, game_key, run_game, SimulationTimeout
+from api.batch import get_game_executor
+from api.profiling import PROFILE_REQUESTED
+from api.metrics import (
+    RESPONSE_CACHE_LOOKUPS,
+    ROUTED_PROMPTS,
+    RESPONSE_PHASE_SECONDS,
+    RESPONSE_SECONDS,
+    TOOL_CALLS,
+    call_with_metrics,
+    merge_metrics,
+)
+from ai_client.response_cache import MemoryBackend, ResponseCache, SQLiteBackend
+from ai_client.router import format_answer, parse_prompt
 
 GPT_MODEL = "gpt-4o-mini"
+SYSTEM_PROMPTS = [
+    "Parse the prompt and use it to call the run_game function as many times as needed",
+    "If you are asked to generate/decide the words, come up with N number of words that do not share similarities",
+    "Format your response well, do not add any asterix.",
+    "If a word or prompt is not provided by the user, return an appropriate error message.",
+]
+FINAL_INSTRUCTIONS = "Respond in a way that answers the user's question using the response"
+TOOLS = [
+    {
+        "type": "function",
+        "name": "run_game",
+        "description": "Get information about the generations and scores for Conways game of life",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "word": {
+                    "type": "string",
+                    "description": "The search query for the data which must include the query or word to call the function with"
+                }
+            },
+            "required": ["word"],
+        },
+    }
+]
+MAX_TOOL_ROUNDS = int(os.environ.get("CGOL_MAX_TOOL_ROUNDS", 5))
+LOCAL_ROUTER = os.environ.get("CGOL_LOCAL_ROUTER", "1") != "0"
+RESPONSE_CACHE_SIZE = int(os.environ.get("CGOL_RESPONSE_CACHE_SIZE", 1024))
+RESPONSE_CACHE_PATH = os.environ.get("CGOL_RESPONSE_CACHE_PATH")
+RESPONSE_CACHE = ResponseCache(
+    backend=SQLiteBackend(RESPONSE_CACHE_PATH, RESPONSE_CACHE_SIZE) if RESPONSE_CACHE_PATH else MemoryBackend(RESPONSE_CACHE_SIZE),
+    ttl=float(os.environ.get("CGOL_RESPONSE_CACHE_TTL", 3600)),
+)
 
 class ServerError(Exception):
     """Exception raised for server-related errors when communicating with the OpenAI API."""
@@ -20,21 +70,318 @@ class OpenAIServerError(Exception):
     """Exception raised for OpenAI-specific errors such as timeouts or bad requests."""
     pass
 
-def client_response(client: OpenAI, user_input: str)->str:
+class ResponseTimeout(Exception):
+    """Exception raised when a response can't be completed before its deadline."""
+    pass
+
+def time_remaining(deadline: float | None) -> float | None:
+    """
+    Returns the seconds left before a deadline.
+
+    Args:
+        deadline (float | None): Wall-clock time, as returned by time.time(), or None for no deadline.
+
+    Returns:
+        float | None: The seconds left, or None if there is no deadline.
+
+    Raises:
+        ResponseTimeout: If the deadline has passed.
+    """
+    if deadline is None:
+        return None
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        raise ResponseTimeout()
+    return remaining
+
+def request_options(deadline: float | None, final_round: bool = False) -> dict:
+    """
+    Returns the extra responses.create arguments for a model call.
+
+    Args:
+        deadline (float | None): Wall-clock deadline of the whole response, or None.
+        final_round (bool, optional): Whether this is the last call allowed, in which case the
+                                      model is told not to call any more tools. Defaults to False.
+
+    Returns:
+        dict: Keyword arguments for responses.create.
+
+    Raises:
+        ResponseTimeout: If the deadline has passed.
+    """
+    options = {}
+    if deadline is not None:
+        options["timeout"] = time_remaining(deadline)
+    if final_round:
+        options["tool_choice"] = "none"
+    return options
+
+def game_options(deadline: float | None) -> dict:
+    """
+    Returns the extra run_game arguments for the games of a response.
+
+    Games in the process pool can't see that the current request asked for profiling, so
+    it is passed to them explicitly.
+
+    Args:
+        deadline (float | None): Wall-clock deadline of the whole response, or None.
+
+    Returns:
+        dict: Keyword arguments for run_game.
+    """
+    options = {}
+    if deadline is not None:
+        options["deadline"] = deadline
+    if PROFILE_REQUESTED.get():
+        options["profile"] = True
+    return options
+
+def function_call_words(function_calls: list) -> list[str]:
+    """Returns the word argument of each 'run_game' function call, in order."""
+    return [json.loads(function_call.arguments)["word"] for function_call in function_calls]
+
+def run_game_calls(function_calls: list, deadline: float | None = None) -> list[dict]:
+    """
+    Runs the game for each 'run_game' function call requested by the model, with run_words.
+
+    Args:
+        function_calls (list): The 'run_game' function call items from the model's response.
+        deadline (float | None, optional): Wall-clock time, as returned by time.time(), by which
+                                           every game must finish. Defaults to None.
+
+    Returns:
+        list[dict]: The game results, in the same order as function_calls.
+
+    Raises:
+        ResponseTimeout: If the deadline passes before every game finishes.
+    """
+    TOOL_CALLS.inc(len(function_calls))
+    return run_words(function_call_words(function_calls), deadline)
+
+def submit_game(executor: Executor, word: str, options: dict) -> tuple[Future, Future | None]:
+    """
+    Submits a word's game to the game executor, unless the same game is already in flight.
+
+    The game joins GAME_FLIGHTS, so a game another request is running, in the executor or on
+    its own thread, is shared rather than run again. The metrics a submitted game records in
+    its worker are merged into this process's once, when it finishes.
+
+    Args:
+        executor (Executor): The game executor.
+        word (str): The word to run the game for.
+        options (dict): Keyword arguments for run_game, as returned by game_options.
+
+    Returns:
+        tuple[Future, Future | None]: The shared future of the game's result, and the executor
+            task if this call submitted it, or None if it joined a game already in flight.
+    """
+    flight = game_key(word)
+    future, leader = GAME_FLIGHTS.join(flight)
+    if not leader:
+        return future, None
+
+    def merge(outcome: tuple[dict, list | None]) -> dict:
+        result, samples = outcome
+        merge_metrics(samples)
+        return result
+
+    task = executor.submit(call_with_metrics, run_game, word, **options)
+    GAME_FLIGHTS.follow(flight, future, task, merge)
+    return future, task
+
+def run_words(words: list[str], deadline: float | None = None) -> list[dict]:
+    """
+    Runs the game for each word.
+
+    A single word runs on the current thread. Several words run concurrently in the game
+    executor, since the simulation is CPU-bound and would otherwise be serialized by the GIL,
+    and games already in flight for other requests are shared, as submit_game does.
+    If the deadline passes, games this call submitted that haven't started are cancelled and
+    running games stop themselves at their next generation. A shared game that was abandoned at
+    its own caller's deadline is run again if this call's deadline hasn't passed.
+
+    Args:
+        words (list[str]): The words to run games for.
+        deadline (float | None, optional): Wall-clock time, as returned by time.time(), by which
+                                           every game must finish. Defaults to None.
+
+    Returns:
+        list[dict]: The game results, in the same order as words.
+
+    Raises:
+        ResponseTimeout: If the deadline passes before every game finishes.
+    """
+    options = game_options(deadline)
+    try:
+        if len(words) <= 1:
+            return [run_game(word, **options) for word in words]
+
+        executor = get_game_executor()
+        results = [None] * len(words)
+        remaining = range(len(words))
+        while remaining:
+            flights = {index: submit_game(executor, words[index], options) for index in remaining}
+            _, pending = wait([future for future, _ in flights.values()], timeout=time_remaining(deadline))
+            if pending:
+                for _, task in flights.values():
+                    if task is not None:
+                        task.cancel()
+                raise ResponseTimeout()
+            remaining = []
+            for index, (future, task) in flights.items():
+                try:
+                    results[index] = future.result()
+                except (SimulationTimeout, CancelledError):
+                    if task is not None:
+                        raise
+                    remaining.append(index)
+        return results
+
+    except SimulationTimeout:
+        raise ResponseTimeout()
+
+
+def build_input_list(user_input: str) -> list:
+    """
+    Builds the running input list for a conversation: the system instructions and the user's input.
+
+    Args:
+        user_input (str): The user's input or query.
+
+    Returns:
+        list: The input list, to be added to as the conversation goes on.
+    """
+    return [{"role": "system", "content": prompt} for prompt in SYSTEM_PROMPTS] + [
+        {"role": "user", "content": user_input}
+    ]
+
+
+def response_cache_key(user_input: str, max_rounds: int) -> str:
+    """
+    Returns the RESPONSE_CACHE key for a prompt: its normalized text with the model, prompts,
+    tools and round limit that shape the answer.
+
+    Args:
+        user_input (str): The user's input or query.
+        max_rounds (int): Maximum number of rounds of function calls.
+
+    Returns:
+        str: The cache key.
+    """
+    return ResponseCache.key(
+        user_input,
+        model=GPT_MODEL,
+        system_prompts=SYSTEM_PROMPTS,
+        instructions=FINAL_INSTRUCTIONS,
+        tools=TOOLS,
+        max_rounds=max_rounds,
+    )
+
+
+def cached_response(key: str) -> dict | None:
+    """
+    Returns the cached answer for a response_cache_key, counting the lookup in api.metrics.
+
+    Args:
+        key (str): The cache key.
+
+    Returns:
+        dict | None: The answer's 'text' and the 'results' of its games, each a dict with the
+                     word and its game result, or None on a miss.
+    """
+    cached = RESPONSE_CACHE.get(key)
+    RESPONSE_CACHE_LOOKUPS.inc(result="miss" if cached is None else "hit")
+    return cached
+
+
+def game_results(function_calls: list, results: list[dict]) -> list[dict]:
+    """Pairs the word of each function call with its game result, as kept in RESPONSE_CACHE."""
+    return [{"word": word, "result": result} for word, result in zip(function_call_words(function_calls), results)]
+
+
+def route_prompt(user_input: str) -> tuple[str, list[str]] | None:
+    """
+    Returns what a simple prompt asks for and its words, if the local router can answer it.
+
+    Args:
+        user_input (str): The user's input or query.
+
+    Returns:
+        tuple[str, list[str]] | None: As returned by ai_client.router.parse_prompt, or None if
+                                      LOCAL_ROUTER is off or the prompt needs the LLM.
+    """
+    if not LOCAL_ROUTER:
+        return None
+    routed = parse_prompt(user_input)
+    if routed is not None:
+        ROUTED_PROMPTS.inc()
+    return routed
+
+
+def get_function_calls(response) -> list:
+    """
+    Returns the 'run_game' function calls requested in a model response.
+
+    Args:
+        response: A response returned by the Responses API.
+
+    Returns:
+        list: The function call items, in the order the model requested them.
+    """
+    return [
+        item for item in response.output
+        if item.type == "function_call" and item.name == "run_game"
+    ]
+
+
+def function_call_outputs(function_calls: list, results: list[dict]) -> list[dict]:
+    """
+    Pairs each function call with its game result as a 'function_call_output' input item.
+
+    Args:
+        function_calls (list): The 'run_game' function call items from the model's response.
+        results (list[dict]): The game results, in the same order as function_calls.
+
+    Returns:
+        list[dict]: The input items to send back to the model.
+    """
+    return [
+        {
+            "type": "function_call_output",
+            "call_id": function_call.call_id,
+            "output": json.dumps(result),
+        }
+        for function_call, result in zip(function_calls, results)
+    ]
+
+
+def client_response(
+    client: OpenAI, user_input: str, max_rounds: int = MAX_TOOL_ROUNDS, timeout: float | None = None
+)->str:
     """
     Handles user input, interacts with the OpenAI API, and returns a formatted response.
 
     This function:
-    - Defines the available tools (functions) for the LLM, specifically the 'run_game' function.
     - Constructs the input prompt for the LLM, including system instructions and the user's input.
-    - Sends the prompt to the OpenAI API and processes the response.
-    - If the LLM requests a function call (e.g., 'run_game'), it executes the function and appends the result to the input list.
-    - Sends the updated input list back to the LLM for a final response.
+    - Sends the prompt to the OpenAI API, with the 'run_game' function in TOOLS, and processes the response.
+    - While the LLM requests function calls (e.g., 'run_game'), it executes them concurrently, appends the
+      results to the input list in the order they were requested and sends the input list back to the LLM.
+      After max_rounds rounds of function calls the LLM is told to answer without calling more.
     - Returns the model's response as a string, with asterisks removed for formatting.
 
+    A simple prompt such as "score monument" is answered by the local router in ai_client.router,
+    which runs the games and fills in a template without calling the model. Other answers are
+    kept in RESPONSE_CACHE, keyed on the normalized prompt, the model, the prompts and the tools,
+    so a repeated prompt is answered without calling the model or running games.
+    The time taken by the whole response and by each phase (first_llm_call, simulations and
+    followup_llm_call) is recorded in api.metrics.
+
     Args:
         client (OpenAI): An authenticated OpenAI client instance.
         user_input (str): The user's input or query.
+        max_rounds (int, optional): Maximum number of rounds of function calls. Defaults to MAX_TOOL_ROUNDS.
+        timeout (float | None, optional): Seconds allowed for the whole response, covering both the
+                                          LLM calls and the games. Defaults to None, for no limit.
 
     Returns:
         str: The formatted response from the LLM.
@@ -42,73 +389,331 @@ def client_response(client: OpenAI, user_input: str)->str:
     Raises:
         ServerError: If there is a connection, authentication, or rate limit error.
         OpenAIServerError: If there is a timeout, bad request, or internal server error.
+        ResponseTimeout: If the response can't be completed within the timeout.
     """
+    started = time.perf_counter()
+    deadline = None if timeout is None else time.time() + timeout
+    cache_key = response_cache_key(user_input, max_rounds)
     try:
-        tools = [
-            {
-                "type": "function",
-                "name": "run_game",
-                "description": "Get information about the generations and scores for Conways game of life",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "word": {
-                            "type": "string",
-                            "description": "The search query for the data which must include the query or word to call the function with"
-                        }
-                    },
-                    "required": ["word"],
-                },
-            }
-        ]
+        routed = route_prompt(user_input)
+        if routed is not None:
+            asked, words = routed
+            with RESPONSE_PHASE_SECONDS.time(phase="simulations"):
+                results = run_words(words, deadline)
+            return format_answer(asked, words, results)
+
+        cached = cached_response(cache_key)
+        if cached is not None:
+            return cached["text"]
 
         # Create a running input list we will add to over time
-        input_list = [
-            {"role": "system", "content": "Parse the prompt and use it to call the run_game function as many times as needed"},
-            {"role": "system", "content": "If you are asked to generate/decide the words, come up with N number of words that do not share similarities"},
-            {"role": "system", "content": "Format your response well, do not add any asterix."},
-            {"role": "system", "content": "If a word or prompt is not provided by the user, return an appropriate error message."},
-            {"role": "user", "content": user_input}
-        ]
+        input_list = build_input_list(user_input)
 
         # 2. Prompt the model with tools defined
-        response = client.responses.create(
-            model=GPT_MODEL,
-            tools=tools, # type: ignore
-            input=input_list, # type: ignore
-        )
-
-        # Save function call outputs for subsequent requests
-        function_call = None
-        function_call_arguments = None
-        input_list += response.output
-
-
-        for item in response.output:
-            if item.type == "function_call" and item.name == "run_game":
-                function_call = item
-                function_call_arguments = json.loads(item.arguments)
-            
-
-                result = run_game(function_call_arguments["word"])
-                input_list.append({
-                    "type": "function_call_output",
-                    "call_id": function_call.call_id,
-                    "output": json.dumps(result),
-                })
-
-        response = client.responses.create(
-            model=GPT_MODEL,
-            instructions="Respond in a way that answers the user's question using the response",
-            tools=tools, # type: ignore
-            input=input_list, # type: ignore
-        )
-
-        return response.output_text.replace("*", "") #The model tends to respond with double asterisks, I assume for emphasis, so I removed them
+        with RESPONSE_PHASE_SECONDS.time(phase="first_llm_call"):
+            response = client.responses.create(
+                model=GPT_MODEL,
+                tools=TOOLS, # type: ignore
+                input=input_list, # type: ignore
+                **request_options(deadline),
+            )
+
+        answered = []
+        for round_number in range(1, max_rounds + 1):
+            function_calls = get_function_calls(response)
+            if not function_calls:
+                break
+
+            # Save function call outputs for subsequent requests
+            input_list += response.output
+            with RESPONSE_PHASE_SECONDS.time(phase="simulations"):
+                results = run_game_calls(function_calls, deadline)
+            input_list += function_call_outputs(function_calls, results)
+            answered += game_results(function_calls, results)
+
+            with RESPONSE_PHASE_SECONDS.time(phase="followup_llm_call"):
+                response = client.responses.create(
+                    model=GPT_MODEL,
+                    instructions=FINAL_INSTRUCTIONS,
+                    tools=TOOLS, # type: ignore
+                    input=input_list, # type: ignore
+                    **request_options(deadline, final_round=round_number == max_rounds),
+                )
+
+        text = response.output_text.replace("*", "") #The model tends to respond with double asterisks, I assume for emphasis, so I removed them
+        RESPONSE_CACHE.set(cache_key, {"text": text, "results": answered})
+        return text
+
+    except APITimeoutError as e:
+        # A model call given only the time left before the deadline timed out
+        time_remaining(deadline)
+        raise ServerError()
+
+    except (APIConnectionError, AuthenticationError, RateLimitError) as e:
+        raise ServerError()
+
+    except (BadRequestError, InternalServerError) as e:
+        raise OpenAIServerError()
+
+    finally:
+        RESPONSE_SECONDS.observe(time.perf_counter() - started)
+
+
+async def async_client_response(
+    client: AsyncOpenAI, user_input: str, max_rounds: int = MAX_TOOL_ROUNDS, timeout: float | None = None
+) -> str:
+    """
+    Async version of client_response for use on an event loop.
+
+    The model calls are awaited on the AsyncOpenAI client, and the games are run by
+    run_game_calls on a worker thread, so the event loop never blocks on the simulation.
+    Prompts are routed, answers cached and metrics recorded as in client_response.
+
+    Args:
+        client (AsyncOpenAI): An authenticated AsyncOpenAI client instance.
+        user_input (str): The user's input or query.
+        max_rounds (int, optional): Maximum number of rounds of function calls. Defaults to MAX_TOOL_ROUNDS.
+        timeout (float | None, optional): Seconds allowed for the whole response, covering both the
+                                          LLM calls and the games. Defaults to None, for no limit.
+
+    Returns:
+        str: The formatted response from the LLM.
+
+    Raises:
+        ServerError: If there is a connection, authentication, or rate limit error.
+        OpenAIServerError: If there is a timeout, bad request, or internal server error.
+        ResponseTimeout: If the response can't be completed within the timeout.
+    """
+    started = time.perf_counter()
+    deadline = None if timeout is None else time.time() + timeout
+    cache_key = response_cache_key(user_input, max_rounds)
+    try:
+        routed = route_prompt(user_input)
+        if routed is not None:
+            asked, words = routed
+            with RESPONSE_PHASE_SECONDS.time(phase="simulations"):
+                results = await asyncio.to_thread(run_words, words, deadline)
+            return format_answer(asked, words, results)
+
+        cached = cached_response(cache_key)
+        if cached is not None:
+            return cached["text"]
+
+        input_list = build_input_list(user_input)
+
+        with RESPONSE_PHASE_SECONDS.time(phase="first_llm_call"):
+            response = await client.responses.create(
+                model=GPT_MODEL,
+                tools=TOOLS, # type: ignore
+                input=input_list, # type: ignore
+                **request_options(deadline),
+            )
+
+        answered = []
+        for round_number in range(1, max_rounds + 1):
+            function_calls = get_function_calls(response)
+            if not function_calls:
+                break
+
+            input_list += response.output
+            with RESPONSE_PHASE_SECONDS.time(phase="simulations"):
+                results = await asyncio.to_thread(run_game_calls, function_calls, deadline)
+            input_list += function_call_outputs(function_calls, results)
+            answered += game_results(function_calls, results)
+
+            with RESPONSE_PHASE_SECONDS.time(phase="followup_llm_call"):
+                response = await client.responses.create(
+                    model=GPT_MODEL,
+                    instructions=FINAL_INSTRUCTIONS,
+                    tools=TOOLS, # type: ignore
+                    input=input_list, # type: ignore
+                    **request_options(deadline, final_round=round_number == max_rounds),
+                )
+
+        text = response.output_text.replace("*", "")
+        RESPONSE_CACHE.set(cache_key, {"text": text, "results": answered})
+        return text
+
+    except APITimeoutError as e:
+        # A model call given only the time left before the deadline timed out
+        time_remaining(deadline)
+        raise ServerError()
+
+    except (APIConnectionError, AuthenticationError, RateLimitError) as e:
+        raise ServerError()
+
+    except (BadRequestError, InternalServerError) as e:
+        raise OpenAIServerError()
+
+    finally:
+        RESPONSE_SECONDS.observe(time.perf_counter() - started)
+
+
+async def iter_game_results(words: list[str], deadline: float | None = None):
+    """
+    Runs the games for some words and yields each result as soon as it finishes.
+
+    A single word runs on a worker thread; several words run concurrently in the game executor,
+    sharing games already in flight for other requests as submit_game does, and are awaited
+    without holding a thread.
+
+    Args:
+        words (list[str]): The words to run games for, such as the words of the model's
+                           'run_game' function calls.
+        deadline (float | None, optional): Wall-clock time, as returned by time.time(), by which
+                                           every game must finish. Defaults to None.
+
+    Yields:
+        tuple[int, str, dict]: The index of the word, the word and its game result,
+                               in the order the games finish.
+
+    Raises:
+        ResponseTimeout: If the deadline passes before every game finishes.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_game_executor() if len(words) > 1 else None
+    options = game_options(deadline)
+
+    submitted = []
+
+    async def play(index: int, word: str):
+        if executor is None:
+            result, samples = await loop.run_in_executor(
+                executor, functools.partial(call_with_metrics, run_game, word, **options)
+            )
+            merge_metrics(samples)
+            return index, word, result
+
+        while True:
+            future, task = submit_game(executor, word, options)
+            if task is not None:
+                submitted.append(task)
+            shared = asyncio.wrap_future(future)
+            try:
+                # Shielded, so that cancelling this coroutine doesn't cancel the game for other requests
+                return index, word, await asyncio.shield(shared)
+            except asyncio.CancelledError:
+                if task is not None or not shared.cancelled():
+                    raise
+            except SimulationTimeout:
+                if task is not None:
+                    raise
+            time_remaining(deadline)
+
+    tasks = [asyncio.ensure_future(play(index, word)) for index, word in enumerate(words)]
+    try:
+        for task in asyncio.as_completed(tasks, timeout=time_remaining(deadline)):
+            yield await task
+    except (SimulationTimeout, asyncio.TimeoutError):
+        raise ResponseTimeout()
+    finally:
+        for task in tasks:
+            task.cancel()
+        for task in submitted:
+            task.cancel()
+
+
+async def stream_client_response(
+    client: AsyncOpenAI, user_input: str, max_rounds: int = MAX_TOOL_ROUNDS, timeout: float | None = None
+):
+    """
+    Streaming version of async_client_response.
+
+    Follows the same tool-calling loop, but yields events as the work happens instead of
+    returning the final text: a 'result' event as each game finishes and a 'token' event
+    for each piece of the model's answer as it arrives from the Responses streaming API.
+    A routed or cached answer is sent as its 'result' events and a single 'token' event. Phases are
+    timed as in client_response, including any time the caller takes to read the events
+    yielded during them.
+
+    Args:
+        client (AsyncOpenAI): An authenticated AsyncOpenAI client instance.
+        user_input (str): The user's input or query.
+        max_rounds (int, optional): Maximum number of rounds of function calls. Defaults to MAX_TOOL_ROUNDS.
+        timeout (float | None, optional): Seconds allowed for the whole response, covering both the
+                                          LLM calls and the games. Defaults to None, for no limit.
+
+    Yields:
+        tuple[str, object]: (event, data) pairs. 'result' data is a dict with the word and its
+                            game result, 'token' data is a piece of text.
+
+    Raises:
+        ServerError: If there is a connection, authentication, or rate limit error.
+        OpenAIServerError: If there is a timeout, bad request, or internal server error.
+        ResponseTimeout: If the response can't be completed within the timeout.
+    """
+    started = time.perf_counter()
+    deadline = None if timeout is None else time.time() + timeout
+    cache_key = response_cache_key(user_input, max_rounds)
+    try:
+        routed = route_prompt(user_input)
+        if routed is not None:
+            asked, words = routed
+            results = [None] * len(words)
+            with RESPONSE_PHASE_SECONDS.time(phase="simulations"):
+                async for index, word, result in iter_game_results(words, deadline):
+                    results[index] = result
+                    yield "result", {"word": word, "result": result}
+            yield "token", format_answer(asked, words, results)
+            return
+
+        cached = cached_response(cache_key)
+        if cached is not None:
+            for data in cached["results"]:
+                yield "result", data
+            yield "token", cached["text"]
+            return
+
+        input_list = build_input_list(user_input)
+        options = {"tools": TOOLS, **request_options(deadline)}
+        answered, tokens = [], []
+
+        for round_number in range(max_rounds + 1):
+            response = None
+            with RESPONSE_PHASE_SECONDS.time(phase="followup_llm_call" if round_number else "first_llm_call"):
+                stream = await client.responses.create(
+                    model=GPT_MODEL,
+                    input=input_list, # type: ignore
+                    stream=True,
+                    **options,
+                )
+                async for event in stream:
+                    if event.type == "response.output_text.delta":
+                        tokens.append(event.delta.replace("*", ""))
+                        yield "token", tokens[-1]
+                    elif event.type == "response.completed":
+                        response = event.response
+
+            function_calls = get_function_calls(response) if response is not None else []
+            if not function_calls or round_number == max_rounds:
+                RESPONSE_CACHE.set(cache_key, {"text": "".join(tokens), "results": answered})
+                return
+
+            input_list += response.output
+            results = [None] * len(function_calls)
+            with RESPONSE_PHASE_SECONDS.time(phase="simulations"):
+                TOOL_CALLS.inc(len(function_calls))
+                async for index, word, result in iter_game_results(function_call_words(function_calls), deadline):
+                    results[index] = result
+                    yield "result", {"word": word, "result": result}
+            input_list += function_call_outputs(function_calls, results)
+            answered += game_results(function_calls, results)
+
+            options = {
+                "instructions": FINAL_INSTRUCTIONS,
+                "tools": TOOLS,
+                **request_options(deadline, final_round=round_number + 1 == max_rounds),
+            }
+
+    except APITimeoutError as e:
+        time_remaining(deadline)
+        raise ServerError()
 
     except (APIConnectionError, AuthenticationError, RateLimitError) as e:
         raise ServerError()
 
-    except (APITimeoutError, BadRequestError, InternalServerError) as e:
+    except (BadRequestError, InternalServerError) as e:
         raise OpenAIServerError()
-    
\ No newline at end of file
+
+    finally:
+        RESPONSE_SECONDS.observe(time.perf_counter() - started)
@@ -0,0 +1,172 @@
+"""Batch scoring
+This module runs games for many words without the LLM. It owns the process pool that
+runs games off the request thread, parses word lists and JSONL files, and streams
+results back in input order while bounding how far ahead of the reader the pool runs.
+"""
+
+import json
+import multiprocessing
+import os
+import threading
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from api.cgol import run_game
+from api.metrics import call_with_metrics, mark_worker_process, merge_metrics
+from api.profiling import profiled
+
+GAME_WORKERS = os.cpu_count() or 1
+MAX_PENDING_TASKS = GAME_WORKERS * 4
+NUMPY_CHUNK_SIZE = 256
+
+_game_executor = None
+_game_executor_lock = threading.Lock()
+
+
+def get_game_executor() -> Executor:
+    """
+    Returns the process pool that runs games, creating it on first use.
+
+    The pool has one worker per core and uses the spawn start method, since the API server
+    is multi-threaded and forking it could copy held locks into the workers. Workers are
+    marked with api.metrics.mark_worker_process, so tasks submitted through
+    api.metrics.call_with_metrics send back the metrics they record.
+
+    Returns:
+        Executor: The shared game executor.
+    """
+    global _game_executor
+    with _game_executor_lock:
+        if _game_executor is None:
+            _game_executor = ProcessPoolExecutor(
+                max_workers=GAME_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=mark_worker_process,
+            )
+        return _game_executor
+
+
+def parse_words(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Parses words from a word list or a JSONL file, one word per line.
+
+    A line holding a JSON object uses its 'word' key and a line holding a JSON string uses
+    that string. Any other line is taken as a word, with surrounding whitespace removed.
+    Blank lines are skipped.
+
+    Args:
+        lines (Iterable[str]): The lines of the input.
+
+    Yields:
+        str: Each word, in input order.
+
+    Raises:
+        ValueError: If a JSON object has no 'word' key.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith(("{", '"')):
+            value = json.loads(line)
+            if isinstance(value, dict):
+                if "word" not in value:
+                    raise ValueError(f"JSON line has no 'word' key: {line}")
+                value = value["word"]
+            yield value
+        else:
+            yield line
+
+
+def run_chunk(
+    words: list[str], generations: int, engine: str, topology: str = "infinite", profile: bool | None = None
+) -> list[dict]:
+    """
+    Runs the games for a chunk of words in one task.
+
+    The "numpy" engine steps the whole chunk together with run_games; other engines run the
+    words one after another with run_game.
+
+    Args:
+        words (list[str]): The words to score.
+        generations (int): Maximum number of generations to run.
+        engine (str): The stepping engine, one of api.cgol.ENGINES.
+        topology (str, optional): The shape of the plane, one of api.cgol.TOPOLOGIES. Defaults to "infinite".
+        profile (bool | None, optional): Whether to profile the chunk, as api.profiling.profiled does.
+                                         Defaults to None.
+
+    Returns:
+        list[dict]: The result for each word, in order.
+    """
+    with profiled(f"batch-{engine}-{topology}", profile):
+        if engine == "numpy":
+            from api.cgol_numpy import run_games
+            return run_games(words, generations, topology=topology)
+        return [run_game(word, generations, engine, topology=topology) for word in words]
+
+
+def iter_chunks(words: Iterable[str], size: int) -> Iterator[list[str]]:
+    """Yields lists of up to size consecutive words, reading the input only as each list is needed."""
+    chunk = []
+    for word in words:
+        chunk.append(word)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def chunk_results(chunk: list[str], future) -> Iterator[tuple[str, dict]]:
+    """Waits for a chunk's task, merges the metrics it recorded and yields each word with its result."""
+    results, samples = future.result()
+    merge_metrics(samples)
+    return zip(chunk, results)
+
+
+def iter_batch_results(
+    words: Iterable[str],
+    generations: int = 1000,
+    engine: str = "set",
+    executor: Executor | None = None,
+    max_pending: int = MAX_PENDING_TASKS,
+    topology: str = "infinite",
+    profile: bool | None = None,
+) -> Iterator[tuple[str, dict]]:
+    """
+    Runs a game for each word in a process pool, yielding results in input order.
+
+    Each task runs one word, or for the "numpy" engine a chunk of NUMPY_CHUNK_SIZE words that
+    are stepped together. At most max_pending tasks are submitted ahead of the results being
+    yielded, so a slow reader pauses the pool and words are read from the input only as they
+    are needed.
+
+    Args:
+        words (Iterable[str]): The words to score.
+        generations (int, optional): Maximum number of generations to run. Defaults to 1000.
+        engine (str, optional): The stepping engine, one of api.cgol.ENGINES. Defaults to "set".
+        executor (Executor | None, optional): The executor to run games in. Defaults to the
+                                              shared game executor.
+        max_pending (int, optional): Maximum number of tasks in flight. Defaults to MAX_PENDING_TASKS.
+        topology (str, optional): The shape of the plane, one of api.cgol.TOPOLOGIES. Defaults to "infinite".
+        profile (bool | None, optional): Whether to profile each task, as api.profiling.profiled does.
+                                         Defaults to None.
+
+    Yields:
+        tuple[str, dict]: Each word and its game result.
+    """
+    executor = executor or get_game_executor()
+    chunk_size = NUMPY_CHUNK_SIZE if engine == "numpy" else 1
+    pending = deque()
+    try:
+        for chunk in iter_chunks(words, chunk_size):
+            future = executor.submit(call_with_metrics, run_chunk, chunk, generations, engine, topology, profile)
+            pending.append((chunk, future))
+            if len(pending) >= max_pending:
+                yield from chunk_results(*pending.popleft())
+        while pending:
+            yield from chunk_results(*pending.popleft())
+    finally:
+        for _, future in pending:
+            future.cancel()
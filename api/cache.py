@@ -0,0 +1,138 @@
+"""Result cache for run_game
+This module provides a memoizing cache for game results. run_game is a pure function
+of its word, generation limit and engine, so results are kept in a bounded in-process
+LRU and, optionally, in a SQLite file that survives restarts.
+"""
+
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+class ResultCache:
+    """
+    A thread-safe LRU cache of run_game results with an optional SQLite tier.
+
+    Lookups check memory first, then the disk tier; disk hits are promoted into memory.
+    Results are stored as copies so callers can't change cached entries.
+    """
+
+    def __init__(self, maxsize: int = 4096, path: str | None = None):
+        """
+        Args:
+            maxsize (int, optional): Maximum number of results kept in memory. Defaults to 4096.
+            path (str | None, optional): Path of the SQLite file for the persistent tier.
+                                         Defaults to None, which keeps results in memory only.
+        """
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "word TEXT, generations INTEGER, engine TEXT, result TEXT, "
+                "PRIMARY KEY (word, generations, engine))"
+            )
+            self._db.commit()
+
+    def get(self, word: str, generations: int, engine: str) -> dict | None:
+        """
+        Returns the cached result for a game, or None if it hasn't been cached.
+
+        Args:
+            word (str): The word the game was seeded with.
+            generations (int): The generation limit of the game.
+            engine (str): The engine the game was run with.
+
+        Returns:
+            dict | None: A copy of the cached result, or None on a miss.
+        """
+        key = (word, generations, engine)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(self._entries[key])
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT result FROM results WHERE word = ? AND generations = ? AND engine = ?", key
+                ).fetchone()
+                if row is not None:
+                    result = decode_result(row[0])
+                    self._remember(key, result)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return dict(result)
+
+            self.misses += 1
+            return None
+
+    def put(self, word: str, generations: int, engine: str, result: dict):
+        """
+        Stores the result of a game in memory and, if configured, on disk.
+
+        Args:
+            word (str): The word the game was seeded with.
+            generations (int): The generation limit of the game.
+            engine (str): The engine the game was run with.
+            result (dict): The result returned by the game.
+        """
+        key = (word, generations, engine)
+        with self._lock:
+            self._remember(key, dict(result))
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)", (*key, json.dumps(result))
+                )
+                self._db.commit()
+
+    def _remember(self, key: tuple, result: dict):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the cache's counters.
+
+        Returns:
+            dict[str, int]: Dictionary with keys 'hits', 'misses', 'disk_hits' and 'size'.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "size": len(self._entries),
+            }
+
+    def clear(self):
+        """Removes every in-memory entry and resets the counters. The disk tier is kept."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.disk_hits = 0
+
+
+def decode_result(encoded: str) -> dict:
+    """
+    Decodes a JSON-encoded game result, restoring the displacement tuple.
+
+    Args:
+        encoded (str): The JSON string stored in the disk tier.
+
+    Returns:
+        dict: The game result.
+    """
+    result = json.loads(encoded)
+    if result.get("displacement") is not None:
+        result["displacement"] = tuple(result["displacement"])
+    return result
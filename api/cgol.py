@@ -3,16 +3,39 @@ This module implements Conway's Game of Life logic, including functions for
 converting words to bitmasks, generating initial live cells, computing generations,
 and running the game loop. It also provides utilities for displaying the grid and
 checking end conditions.
+
+The public functions take and return (row, column) tuples. Inside the simulation loop each
+cell is packed into a single int, row * CELL_STRIDE + column, so that finding a cell's
+neighbours is an integer addition rather than a new tuple.
 """
 
-from collections import defaultdict, deque
+import os
+import time
+from collections import Counter
+from collections.abc import Iterator
+from concurrent.futures import CancelledError
+from functools import lru_cache
+
+from api import metrics, profiling
+from api.cache import ResultCache
+from api.lookup import get_lookup_table
+from api.singleflight import SingleFlight
 
 ALIVE = "🟩"
 DEAD = "⬜"
 DEAD = "‧"
 ROWS = 60
 COLUMNS = 40
-LIVE_CELL_HISTORY = deque()
+HASH_MODULUS = (1 << 61) - 1
+CELL_HASH_BASE = 0x2545F4914F6CDD1D % HASH_MODULUS
+CELL_STRIDE = 1 << 32
+ENGINES = ("set", "numpy", "hashlife", "incremental")
+TOPOLOGIES = ("infinite", "bounded", "torus")
+GAME_FLIGHTS = SingleFlight("games")
+RESULT_CACHE = ResultCache(
+    maxsize=int(os.environ.get("CGOL_CACHE_SIZE", 4096)),
+    path=os.environ.get("CGOL_CACHE_PATH"),
+)
 CELL_NEIGHBOURS = (
     (-1, -1),
     (-1, 0),
@@ -23,6 +46,50 @@ CELL_NEIGHBOURS = (
     (1, 0),
     (1, 1),
 )
+NEIGHBOUR_OFFSETS = tuple(cnrow * CELL_STRIDE + cncol for cnrow, cncol in CELL_NEIGHBOURS)
+
+
+def pack_cell(cell: tuple[int, int]) -> int:
+    """
+    Packs a (row, column) cell into a single int, row * CELL_STRIDE + column.
+
+    Packed cells sort in the same row-major order as their tuples, and translating a cell by
+    (dr, dc) adds dr * CELL_STRIDE + dc to it. Columns must lie within CELL_STRIDE // 2 of 0.
+
+    Args:
+        cell (tuple[int, int]): The (row, column) of the cell.
+
+    Returns:
+        int: The packed cell.
+    """
+    row, col = cell
+    return row * CELL_STRIDE + col
+
+
+def unpack_cell(key: int) -> tuple[int, int]:
+    """Returns the (row, column) tuple of a packed cell."""
+    row, col = divmod(key + CELL_STRIDE // 2, CELL_STRIDE)
+    return row, col - CELL_STRIDE // 2
+
+
+def pack_cells(live_cells: set[tuple[int, int]]) -> set[int]:
+    """Returns the packed form of a set of (row, column) cells."""
+    return {row * CELL_STRIDE + col for row, col in live_cells}
+
+
+def unpack_cells(keys: set[int]) -> set[tuple[int, int]]:
+    """Returns the (row, column) tuples of a set of packed cells."""
+    return set(map(unpack_cell, keys))
+
+
+GRID_CELLS = frozenset(row * CELL_STRIDE + col for row in range(ROWS) for col in range(COLUMNS))
+# Each packed cell in the ring just outside the grid, mapped to the cell it wraps to on the torus
+TORUS_WRAP = {
+    row * CELL_STRIDE + col: (row % ROWS) * CELL_STRIDE + col % COLUMNS
+    for row in range(-1, ROWS + 1)
+    for col in range(-1, COLUMNS + 1)
+    if not (0 <= row < ROWS and 0 <= col < COLUMNS)
+}
 
 
 def convert_to_ascii_bitmask(word: str) -> list[str]:
@@ -70,26 +137,54 @@ def generate_initial_live_cells(bin_list: list[str]) -> set[tuple[int, int]]:
     return live_cells
 
 
-def next_generation(live_cells: set[tuple[int, int]]) -> set[tuple[int, int]]:
+def next_generation(live_cells: set[tuple[int, int]], topology: str = "infinite") -> set[tuple[int, int]]:
     """
     Computes the next generation of live cells according to Conway's Game of Life rules.
 
+    On the "infinite" plane live cells may go anywhere. The "bounded" topology is the ROWS x COLUMNS
+    grid with permanently dead cells beyond its edges, and "torus" is the same grid with opposite
+    edges joined, so in both the neighbour counts never hold more than ROWS * COLUMNS cells.
+
     Args:
         live_cells (set[tuple[int, int]]): Current set of live cells.
+        topology (str, optional): One of TOPOLOGIES. Defaults to "infinite".
 
     Returns:
         set[tuple[int, int]]: Set of live cells for the next generation.
     """
-    neighbour_count = defaultdict(int)
+    return unpack_cells(next_generation_packed(pack_cells(live_cells), topology))
+
+
+def next_generation_packed(live_cells: set[int], topology: str = "infinite") -> set[int]:
+    """
+    Computes the next generation of a set of packed cells, as next_generation does for tuples.
+
+    Neighbour counts are built by adding each of the eight NEIGHBOUR_OFFSETS to every live cell,
+    so no tuples are created. On the bounded topologies the grid's live cells are always inside
+    it; counts for cells just outside are wrapped onto the opposite edge on the torus, and the
+    cells born outside the grid are dropped on the bounded grid.
+
+    Args:
+        live_cells (set[int]): Current set of packed live cells.
+        topology (str, optional): One of TOPOLOGIES. Defaults to "infinite".
+
+    Returns:
+        set[int]: Set of packed live cells for the next generation.
+    """
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Unknown topology {topology!r}, expected one of {TOPOLOGIES}")
 
-    for row, col in live_cells:
-        for cnrow, cncol in CELL_NEIGHBOURS:
-            neighbour_count[(row + cnrow, col + cncol)] += 1
+    neighbour_count = Counter()
+    for offset in NEIGHBOUR_OFFSETS:
+        neighbour_count.update(map(offset.__add__, live_cells))
 
-    stay_alive = continue_living(neighbour_count, live_cells)
-    come_alive = come_to_life(neighbour_count, live_cells)
+    if topology == "torus":
+        for key in neighbour_count.keys() - GRID_CELLS:
+            neighbour_count[TORUS_WRAP[key]] += neighbour_count.pop(key)
 
-    new_generation = stay_alive | come_alive
+    new_generation = continue_living(neighbour_count, live_cells) | come_to_life(neighbour_count, live_cells)
+    if topology == "bounded":
+        new_generation &= GRID_CELLS
     return new_generation
 
 
@@ -143,70 +238,417 @@ def display_grid(live_cells: set[tuple[int, int]], bounding_box: tuple = (0, 0,
         str: Multiline string representing the grid.
     """
     start_row, start_col, end_row, end_col = bounding_box
+    packed = pack_cells(live_cells)
     grid = []
     for row in range(start_row, end_row):
         display_row = [
-            ALIVE if (row, col) in live_cells else DEAD
-            for col in range(start_col, end_col)
+            ALIVE if key in packed else DEAD
+            for key in range(row * CELL_STRIDE + start_col, row * CELL_STRIDE + end_col)
         ]
         grid.append("".join(display_row))
     return "\n".join(grid)
 
 
-def check_end_conditons(curr_generation: set[tuple[int, int]]) -> bool:
+class SimulationTimeout(Exception):
+    """Exception raised when a simulation is still running at its deadline."""
+    pass
+
+
+@lru_cache(maxsize=1 << 16)
+def cell_hash(key: int) -> int:
     """
-    Checks if the game should end based on the current generation and history.
+    Returns the rolling hash contribution of a single packed live cell.
+
+    A board's hash is the sum of its cells' contributions modulo HASH_MODULUS. Because each
+    contribution is CELL_HASH_BASE**key, translating a board by (dr, dc) multiplies its hash by
+    CELL_HASH_BASE**(dr * CELL_STRIDE + dc), so hashes can be normalized to the board's first
+    cell without rehashing every cell.
 
     Args:
-        curr_generation (set[tuple[int, int]]): The current set of live cells.
+        key (int): The packed cell, as returned by pack_cell.
 
     Returns:
-        bool: True if the game should end, False otherwise.
+        int: The cell's hash contribution.
     """
-    if len(LIVE_CELL_HISTORY) == 0:
-        LIVE_CELL_HISTORY.append(curr_generation)
-        return False
-    if (
-        len(curr_generation) == 0
-        or curr_generation in LIVE_CELL_HISTORY
-        or curr_generation == LIVE_CELL_HISTORY[-1]
-    ):
-        return True
+    return pow(CELL_HASH_BASE, key, HASH_MODULUS)
+
+
+class Simulation:
+    """
+    A single run of Conway's Game of Life for one word.
+
+    Each simulation owns its board and its end-condition history, so separate simulations
+    can run back to back or in parallel threads without sharing state. The history maps a
+    translation-normalized fingerprint of every generation seen so far to the generation
+    number and reference corner it was seen at. A repeated fingerprint means the pattern
+    is periodic, either in place (an oscillator or still life) or moving (a spaceship), and
+    the period and displacement are reported with the result.
 
-    # else add to queue
-    else:
-        if len(LIVE_CELL_HISTORY) == 10:
-            LIVE_CELL_HISTORY.popleft()
-        LIVE_CELL_HISTORY.append(curr_generation)
+    Engines subclass this and override initial_state, population, fingerprint and advance.
+    """
+
+    def __init__(
+        self, word: str, generations: int = 1000, deadline: float | None = None, topology: str = "infinite"
+    ):
+        """
+        Args:
+            word (str): The word to convert into the initial pattern.
+            generations (int, optional): Maximum number of generations to run. Defaults to 1000.
+            deadline (float | None, optional): Wall-clock time, as returned by time.time(), after
+                                               which run stops. Defaults to None, for no deadline.
+            topology (str, optional): The shape of the plane, one of TOPOLOGIES. Defaults to "infinite".
+        """
+        self.word = word
+        self.generations = generations
+        self.deadline = deadline
+        self.topology = topology
+        self.generation = 0
+        self.score = 0
+        self.period = None
+        self.displacement = None
+        self.state = self.initial_state(generate_initial_live_cells(convert_to_ascii_bitmask(word)))
+        self.born = set()
+        self.died = set()
+        self._seen = {}
+        self._hash = 0
+        self._hashed_state = None
+
+    def initial_state(self, live_cells: set[tuple[int, int]]):
+        """Returns the engine's representation of the seed's live cells, packed with pack_cells."""
+        return pack_cells(live_cells)
+
+    def population(self) -> int:
+        """Returns the number of live cells in the current generation."""
+        return len(self.state)
+
+    def fingerprint(self) -> tuple[tuple, tuple[int, int]]:
+        """
+        Returns a translation-normalized key for the current generation and its reference corner.
+
+        The rolling hash is updated from births and deaths in advance, and is only rebuilt
+        from every cell when the state was replaced from outside. The reference corner is the
+        first live cell in row-major order, the smallest packed cell, which moves with the pattern
+        when it is translated, so the hash is normalized to it.
+
+        Returns:
+            tuple[tuple, tuple[int, int]]: The key (population, packed span, normalized hash)
+                                           and the (row, column) of the first live cell.
+        """
+        if self._hashed_state is not self.state:
+            self._hash = sum(map(cell_hash, self.state)) % HASH_MODULUS
+            self._hashed_state = self.state
+
+        first, last = min(self.state), max(self.state)
+        normalized = self._hash * pow(CELL_HASH_BASE, -first, HASH_MODULUS) % HASH_MODULUS
+        return (len(self.state), last - first, normalized), unpack_cell(first)
+
+    def advance(self):
+        """Replaces the current state with the next generation, recording the cells born and died."""
+        new_generation = next_generation_packed(self.state, self.topology)
+        self.born = new_generation - self.state
+        self.died = self.state - new_generation
+        if self._hashed_state is self.state:
+            born = sum(map(cell_hash, self.born))
+            died = sum(map(cell_hash, self.died))
+            self._hash = (self._hash + born - died) % HASH_MODULUS
+            self._hashed_state = new_generation
+        self.state = new_generation
+
+    def check_end_conditions(self) -> bool:
+        """
+        Checks if the game should end based on the current generation and history.
+
+        The game ends when the board is empty or is a translated copy of any earlier generation,
+        in which case period and displacement are set. Otherwise the current generation is
+        recorded in the history.
+
+        Returns:
+            bool: True if the game should end, False otherwise.
+        """
+        if self.population() == 0:
+            return True
+        key, corner = self.fingerprint()
+        if key in self._seen:
+            first_generation, first_corner = self._seen[key]
+            self.period = self.generation - first_generation
+            self.displacement = (corner[0] - first_corner[0], corner[1] - first_corner[1])
+            return True
+
+        self._seen[key] = (self.generation, corner)
         return False
 
+    def steps(self) -> Iterator[int]:
+        """
+        Advances the simulation until an end condition is met or the generation limit is reached.
+
+        The deadline is checked every generation, so a simulation whose result is no longer
+        wanted stops promptly, even in another process.
+
+        Yields:
+            int: The number of each new generation, after it has been computed.
+
+        Raises:
+            SimulationTimeout: If the deadline passes before the simulation finishes.
+        """
+        while self.generation < self.generations:
+            if self.deadline is not None and time.time() > self.deadline:
+                raise SimulationTimeout(f"Simulation of {self.word!r} stopped at generation {self.generation}")
+            if self.check_end_conditions():
+                break
+            self.score += self.population()
+            self.advance()
+            self.generation += 1
+            yield self.generation
+
+    def result(self) -> dict[str, int | tuple[int, int] | None]:
+        """
+        Returns the outcome of the simulation so far.
+
+        Returns:
+            dict[str, int | tuple[int, int] | None]: Dictionary with keys 'generations', 'score',
+                'period' and 'displacement'. Period and displacement are None unless the pattern
+                was found to repeat; a displacement of (0, 0) means it repeats in place.
+        """
+        return {
+            "generations": self.generation,
+            "score": self.score,
+            "period": self.period,
+            "displacement": self.displacement,
+        }
+
+    def run(self) -> dict[str, int | tuple[int, int] | None]:
+        """
+        Runs the simulation to the end and returns its result.
+
+        Returns:
+            dict[str, int | tuple[int, int] | None]: The result, as returned by result.
+
+        Raises:
+            SimulationTimeout: If the deadline passes before the simulation finishes.
+        """
+        for _ in self.steps():
+            pass
+        return self.result()
+
+    def iter_generations(self) -> Iterator[dict[str, int | list[tuple[int, int]]]]:
+        """
+        Runs the simulation, yielding the change made by each generation instead of whole boards.
+
+        The first delta is generation 0, whose born cells are the seed. Applying every delta in
+        order to an empty board reproduces each generation. Only the set engine records births
+        and deaths, so this is only available on Simulation itself.
+
+        Yields:
+            dict[str, int | list[tuple[int, int]]]: Dictionary with keys 'generation', 'born' and
+                'died', where born and died are sorted lists of (row, column) tuples.
+        """
+        yield {"generation": 0, "born": [unpack_cell(key) for key in sorted(self.state)], "died": []}
+        for generation in self.steps():
+            yield {
+                "generation": generation,
+                "born": [unpack_cell(key) for key in sorted(self.born)],
+                "died": [unpack_cell(key) for key in sorted(self.died)],
+            }
+
+
+def get_simulation_class(engine: str, topology: str = "infinite") -> type[Simulation]:
+    """
+    Returns the Simulation class for an engine name, importing optional engines lazily.
+
+    Args:
+        engine (str): The stepping engine, one of ENGINES.
+        topology (str, optional): The shape of the plane, one of TOPOLOGIES. Defaults to "infinite".
+
+    Returns:
+        type[Simulation]: The simulation class implementing the engine.
+
+    Raises:
+        ValueError: If the engine is not one of ENGINES, the topology is not one of TOPOLOGIES,
+                    or the engine doesn't support the topology.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}")
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Unknown topology {topology!r}, expected one of {TOPOLOGIES}")
+    if engine == "hashlife" and topology != "infinite":
+        raise ValueError("The hashlife engine only supports the infinite topology")
+    if engine == "numpy":
+        from api.cgol_numpy import FixedNumpySimulation, NumpySimulation
+        return NumpySimulation if topology == "infinite" else FixedNumpySimulation
+    if engine == "hashlife":
+        from api.hashlife import HashLifeSimulation
+        return HashLifeSimulation
+    if engine == "incremental":
+        from api.cgol_incremental import IncrementalSimulation
+        return IncrementalSimulation
+    return Simulation
+
+
+def engine_key(engine: str, topology: str = "infinite") -> str:
+    """Returns the engine name results are cached under, which includes the topology unless it is infinite."""
+    return engine if topology == "infinite" else f"{engine}/{topology}"
+
+
+def cached_result(word: str, generations: int, key: str) -> dict | None:
+    """
+    Returns a game's result from the lookup table or RESULT_CACHE, without simulating it.
+
+    The lookup table at CGOL_LOOKUP_PATH is read first, then RESULT_CACHE. Lookups are
+    counted in api.metrics.
+
+    Args:
+        word (str): The word the game is seeded with.
+        generations (int): The generation limit of the game.
+        key (str): The engine and topology of the game, as returned by engine_key.
+
+    Returns:
+        dict | None: The result, or None if the game hasn't been run before.
+    """
+    table = get_lookup_table()
+    if table is not None:
+        result = table.get(word, generations, key)
+        if result is not None:
+            metrics.LOOKUP_TABLE_HITS.inc()
+            return result
+    result = RESULT_CACHE.get(word, generations, key)
+    metrics.CACHE_LOOKUPS.inc(result="miss" if result is None else "hit")
+    return result
 
-def run_game(word: str, generations: int = 1000)-> dict[str, int]:
+
+def record_game_metrics(key: str, result: dict):
+    """
+    Counts a simulated game, its generations and the live cells processed in api.metrics.
+
+    Args:
+        key (str): The engine and topology the game ran on, as returned by engine_key.
+        result (dict): The game's result. Its score is the live cells summed over every generation.
+    """
+    metrics.GAMES.inc(engine=key)
+    metrics.GENERATIONS.inc(result["generations"], engine=key)
+    metrics.CELLS.inc(result["score"], engine=key)
+
+
+def run_game(
+    word: str,
+    generations: int = 1000,
+    engine: str = "set",
+    use_cache: bool = True,
+    deadline: float | None = None,
+    topology: str = "infinite",
+    profile: bool | None = None,
+)-> dict[str, int | tuple[int, int] | None]:
     """
     Runs Conway's Game of Life for a given word and returns the number of generations and score.
 
+    Results are read from the lookup table at CGOL_LOOKUP_PATH, if there is one, and are
+    memoized in RESULT_CACHE, so repeated words are returned without simulating. While a game is
+    being simulated, other calls for the same word, generations, engine and topology wait for its
+    result in GAME_FLIGHTS instead of simulating it again. Cache lookups, and the time, generations and cells of each game simulated, are recorded
+    in api.metrics.
+
     Args:
         word (str): The word to convert into the initial pattern.
         generations (int, optional): Maximum number of generations to run. Defaults to 1000.
+        engine (str, optional): The stepping engine, one of ENGINES. "set" steps a set of
+                                (row, column) tuples, "numpy" steps a dense array and needs numpy,
+                                "hashlife" jumps ahead with a memoized quadtree for long runs,
+                                "incremental" only recomputes cells near last generation's changes.
+                                Defaults to "set".
+        use_cache (bool, optional): Whether to read the lookup table, read and write RESULT_CACHE
+                                    and share games in flight. Defaults to True.
+        deadline (float | None, optional): Wall-clock time, as returned by time.time(), after which
+                                           the simulation is abandoned. Defaults to None.
+        topology (str, optional): The shape of the plane, one of TOPOLOGIES. "infinite" lets the
+                                  pattern grow without limit, "bounded" clips it to the ROWS x COLUMNS
+                                  grid and "torus" wraps it around that grid's edges.
+                                  Defaults to "infinite".
+        profile (bool | None, optional): Whether to profile the simulation into CGOL_PROFILE_DIR, as
+                                         api.profiling.profiled does. Defaults to None, which profiles
+                                         it if the current request asked for profiling.
 
     Returns:
-        dict[str, int]: Dictionary with keys 'generations' and 'score'.
-    """
-    curr_gen_number = 0
-    total_cells_spawned = 0
-    ascii_bits = convert_to_ascii_bitmask(word)
-    curr_gen = generate_initial_live_cells(ascii_bits)
-
-    while curr_gen_number < generations:
-        should_end = check_end_conditons(curr_gen)
-        if should_end:
-            break
-        total_cells_spawned += len(curr_gen)
-        next_gen = next_generation(curr_gen)
-        curr_gen = next_gen
-        curr_gen_number += 1
-
-    return {"generations": curr_gen_number, "score": total_cells_spawned}
+        dict[str, int | tuple[int, int] | None]: Dictionary with keys 'generations', 'score',
+            'period' and 'displacement', as returned by Simulation.run.
+
+    Raises:
+        ValueError: If the engine or topology is unknown, or the engine doesn't support the topology.
+        SimulationTimeout: If the deadline passes before the simulation finishes.
+    """
+    simulation_class = get_simulation_class(engine, topology)
+    key = engine_key(engine, topology)
+    if use_cache:
+        cached = cached_result(word, generations, key)
+        if cached is not None:
+            return cached
+
+    if not use_cache:
+        return simulate_game(simulation_class, key, word, generations, deadline, topology, profile, use_cache=False)
+
+    flight = game_key(word, generations, engine, topology)
+    while True:
+        future, leader = GAME_FLIGHTS.join(flight)
+        if leader:
+            return GAME_FLIGHTS.run(
+                flight, future, simulate_game, simulation_class, key, word, generations, deadline, topology, profile
+            )
+        try:
+            return dict(future.result(timeout=None if deadline is None else max(deadline - time.time(), 0)))
+        except TimeoutError:
+            raise SimulationTimeout()
+        except (SimulationTimeout, CancelledError):
+            # The game was abandoned at another caller's deadline; run it again if there is time left
+            if deadline is not None and time.time() >= deadline:
+                raise SimulationTimeout()
+
+
+def game_key(word: str, generations: int = 1000, engine: str = "set", topology: str = "infinite") -> tuple[str, int, str]:
+    """Returns the key a game is coalesced under in GAME_FLIGHTS."""
+    return word, generations, engine_key(engine, topology)
+
+
+def simulate_game(
+    simulation_class: type["Simulation"],
+    key: str,
+    word: str,
+    generations: int,
+    deadline: float | None,
+    topology: str,
+    profile: bool | None,
+    use_cache: bool = True,
+) -> dict[str, int | tuple[int, int] | None]:
+    """
+    Simulates a game for run_game and records its metrics.
+
+    With use_cache, the result is stored in RESULT_CACHE, and a result cached since run_game's own
+    lookup, by a game that finished in the meantime, is returned without simulating.
+    """
+    if use_cache:
+        cached = RESULT_CACHE.get(word, generations, key)
+        if cached is not None:
+            return cached
+    with metrics.GAME_SECONDS.time(engine=key), profiling.profiled(f"run_game-{key}", profile):
+        result = simulation_class(word, generations, deadline, topology).run()
+    record_game_metrics(key, result)
+    if use_cache:
+        RESULT_CACHE.put(word, generations, key, result)
+    return result
+
+
+def iter_generations(
+    word: str, generations: int = 1000, topology: str = "infinite"
+) -> Iterator[dict[str, int | list[tuple[int, int]]]]:
+    """
+    Runs Conway's Game of Life for a given word, yielding each generation's cells born and died.
+
+    Args:
+        word (str): The word to convert into the initial pattern.
+        generations (int, optional): Maximum number of generations to run. Defaults to 1000.
+        topology (str, optional): The shape of the plane, one of TOPOLOGIES. Defaults to "infinite".
+
+    Yields:
+        dict[str, int | list[tuple[int, int]]]: The deltas, as yielded by Simulation.iter_generations.
+    """
+    return Simulation(word, generations, topology=topology).iter_generations()
 
 
 if __name__ == "__main__":
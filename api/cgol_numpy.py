@@ -0,0 +1,382 @@
+"""NumPy stepping engine
+This module implements a vectorized engine for Conway's Game of Life. The board is
+stored as a dense uint8 array that is cropped to the live region every generation,
+and neighbour counts are computed with eight shifted slices instead of a dictionary
+of tuple keys. It produces the same generations and score as the set engine in
+api.cgol. On the bounded and torus topologies the board is the whole fixed grid and is
+stepped in place. run_games steps the boards of many words together in one 3-D array.
+"""
+
+import numpy as np
+
+from api.cgol import (
+    COLUMNS,
+    RESULT_CACHE,
+    ROWS,
+    Simulation,
+    cached_result,
+    convert_to_ascii_bitmask,
+    engine_key,
+    generate_initial_live_cells,
+    record_game_metrics,
+)
+
+FRAME_MARGIN = 8
+SPILL_SIZE = 64
+
+
+def cells_to_board(live_cells: set[tuple[int, int]]) -> tuple[np.ndarray, tuple[int, int]]:
+    """
+    Converts a set of live cells into a dense board cropped to their bounding box.
+
+    Args:
+        live_cells (set[tuple[int, int]]): Set of (row, column) tuples for live cells.
+
+    Returns:
+        tuple[np.ndarray, tuple[int, int]]: The uint8 board and the (row, column) of its top-left cell.
+    """
+    if not live_cells:
+        return np.zeros((0, 0), dtype=np.uint8), (0, 0)
+
+    rows, cols = np.array(sorted(live_cells)).T
+    origin = (int(rows.min()), int(cols.min()))
+    board = np.zeros((rows.max() - origin[0] + 1, cols.max() - origin[1] + 1), dtype=np.uint8)
+    board[rows - origin[0], cols - origin[1]] = 1
+    return board, origin
+
+
+def board_to_cells(board: np.ndarray, origin: tuple[int, int]) -> set[tuple[int, int]]:
+    """
+    Converts a dense board back into a set of live cells.
+
+    Args:
+        board (np.ndarray): The uint8 board.
+        origin (tuple[int, int]): The (row, column) of the board's top-left cell.
+
+    Returns:
+        set[tuple[int, int]]: Set of (row, column) tuples for live cells.
+    """
+    rows, cols = np.nonzero(board)
+    return {(int(row) + origin[0], int(col) + origin[1]) for row, col in zip(rows, cols)}
+
+
+def crop_board(board: np.ndarray, origin: tuple[int, int]) -> tuple[np.ndarray, tuple[int, int]]:
+    """
+    Crops a board to the bounding box of its live cells.
+
+    Args:
+        board (np.ndarray): The uint8 board.
+        origin (tuple[int, int]): The (row, column) of the board's top-left cell.
+
+    Returns:
+        tuple[np.ndarray, tuple[int, int]]: The cropped board and its new origin.
+                                            An empty board is returned as a 0x0 array.
+    """
+    live_rows = np.flatnonzero(board.any(axis=1))
+    if live_rows.size == 0:
+        return np.zeros((0, 0), dtype=np.uint8), (0, 0)
+    live_cols = np.flatnonzero(board.any(axis=0))
+    top, bottom = live_rows[0], live_rows[-1] + 1
+    left, right = live_cols[0], live_cols[-1] + 1
+    return board[top:bottom, left:right], (origin[0] + int(top), origin[1] + int(left))
+
+
+def next_generation_board(board: np.ndarray, origin: tuple[int, int]) -> tuple[np.ndarray, tuple[int, int]]:
+    """
+    Computes the next generation of a cropped board.
+
+    The board is grown by one cell on each side so that births on the edge of the live region
+    are kept. Each cell's 3x3 block is summed from shifted views, the cell included, so a cell
+    lives on with a block sum of 3, or of 4 if it is alive.
+
+    Args:
+        board (np.ndarray): The uint8 board, cropped to its live cells.
+        origin (tuple[int, int]): The (row, column) of the board's top-left cell.
+
+    Returns:
+        tuple[np.ndarray, tuple[int, int]]: The next board, cropped to its live cells, and its origin.
+    """
+    if board.size == 0:
+        return board, origin
+
+    height, width = board.shape
+    padded = np.zeros((height + 4, width + 4), dtype=np.uint8)
+    padded[2:-2, 2:-2] = board
+    # Sum each 3x3 block, the cell included, as a vertical then a horizontal sum of three
+    column_sums = padded[:-2] + padded[1:-1] + padded[2:]
+    block_sums = column_sums[:, :-2] + column_sums[:, 1:-1] + column_sums[:, 2:]
+    alive = padded[1:-1, 1:-1]
+    new_board = ((block_sums == 3) | ((block_sums == 4) & (alive == 1))).view(np.uint8)
+    return crop_board(new_board, (origin[0] - 1, origin[1] - 1))
+
+
+def board_fingerprint(board: np.ndarray) -> tuple[tuple[int, int], int]:
+    """
+    Returns a translation-normalized key for a cropped board.
+
+    Two cropped boards get the same key when they hold the same pattern, wherever it is.
+
+    Args:
+        board (np.ndarray): The uint8 board, cropped to its live cells.
+
+    Returns:
+        tuple[tuple[int, int], int]: The board's shape and the hash of its packed bits.
+    """
+    return board.shape, hash(np.packbits(board).tobytes())
+
+
+class NumpySimulation(Simulation):
+    """
+    A Simulation that keeps its board as a cropped uint8 array and its top-left origin.
+
+    End conditions and scoring are inherited from Simulation, so results match the set engine.
+    """
+
+    def initial_state(self, live_cells: set[tuple[int, int]]) -> tuple[np.ndarray, tuple[int, int]]:
+        return cells_to_board(live_cells)
+
+    def population(self) -> int:
+        return int(np.count_nonzero(self.state[0]))
+
+    def fingerprint(self) -> tuple[tuple, tuple[int, int]]:
+        board, origin = self.state
+        return board_fingerprint(board), origin
+
+    def advance(self):
+        self.state = next_generation_board(*self.state)
+
+
+class FixedNumpySimulation(NumpySimulation):
+    """
+    A NumpySimulation on the bounded or torus topology, whose board is the whole ROWS x COLUMNS grid.
+
+    The board and every intermediate array are allocated once and each generation is computed
+    in place, so memory and time per generation stay the same whatever the pattern does.
+    """
+
+    def initial_state(self, live_cells: set[tuple[int, int]]) -> tuple[np.ndarray, tuple[int, int]]:
+        board = np.zeros((ROWS, COLUMNS), dtype=np.uint8)
+        for row, col in live_cells:
+            board[row, col] = 1
+        self._padded = np.zeros((ROWS + 2, COLUMNS + 2), dtype=np.uint8)
+        self._column_sums = np.empty((ROWS, COLUMNS + 2), dtype=np.uint8)
+        self._block_sums = np.empty((ROWS, COLUMNS), dtype=np.uint8)
+        self._survivals = np.empty((ROWS, COLUMNS), dtype=bool)
+        self._births = np.empty((ROWS, COLUMNS), dtype=bool)
+        return board, (0, 0)
+
+    def fingerprint(self) -> tuple[tuple, tuple[int, int]]:
+        board, origin = crop_board(*self.state)
+        return board_fingerprint(board), origin
+
+    def advance(self):
+        board = self.state[0]
+        padded, column_sums, block_sums = self._padded, self._column_sums, self._block_sums
+        padded[1:-1, 1:-1] = board
+        if self.topology == "torus":
+            padded[0, 1:-1] = board[-1]
+            padded[-1, 1:-1] = board[0]
+            padded[:, 0] = padded[:, -2]
+            padded[:, -1] = padded[:, 1]
+        np.add(padded[:-2], padded[1:-1], out=column_sums)
+        np.add(column_sums, padded[2:], out=column_sums)
+        np.add(column_sums[:, :-2], column_sums[:, 1:-1], out=block_sums)
+        np.add(block_sums, column_sums[:, 2:], out=block_sums)
+        np.equal(block_sums, 4, out=self._survivals)
+        np.logical_and(self._survivals, board, out=self._survivals)
+        np.equal(block_sums, 3, out=self._births)
+        np.logical_or(self._survivals, self._births, out=self._survivals)
+        np.copyto(board, self._survivals, casting="unsafe")
+
+
+def resume_simulation(
+    word: str, generations: int, board: np.ndarray, origin: tuple[int, int], generation: int, score: int, seen: dict
+) -> NumpySimulation:
+    """
+    Returns a NumpySimulation that carries on a game part way through.
+
+    Args:
+        word (str): The word the game was seeded with.
+        generations (int): Maximum number of generations to run.
+        board (np.ndarray): The current board, cropped to its live cells.
+        origin (tuple[int, int]): The (row, column) of the board's top-left cell.
+        generation (int): The number of the current generation.
+        score (int): The score of the generations before the current one.
+        seen (dict): The end-condition history of the earlier generations, keyed by board_fingerprint.
+
+    Returns:
+        NumpySimulation: The simulation, ready to run from the current generation.
+    """
+    simulation = NumpySimulation(word, generations)
+    simulation.state = (board, origin)
+    simulation.generation = generation
+    simulation.score = score
+    simulation._seen = seen
+    return simulation
+
+
+def step_boards(boards: np.ndarray, topology: str = "infinite") -> np.ndarray:
+    """
+    Computes the next generation of a stack of boards that share one frame.
+
+    Cells beyond the frame are dead, or on the torus topology are the cells on the opposite edge.
+    On the infinite plane this would cut off births just outside the frame, so callers keep its
+    outer ring empty.
+
+    Args:
+        boards (np.ndarray): The (N, H, W) uint8 stack of boards.
+        topology (str, optional): One of api.cgol.TOPOLOGIES. Defaults to "infinite".
+
+    Returns:
+        np.ndarray: The (N, H, W) stack of next generations.
+    """
+    count, height, width = boards.shape
+    padded = np.zeros((count, height + 2, width + 2), dtype=np.uint8)
+    padded[:, 1:-1, 1:-1] = boards
+    if topology == "torus":
+        padded[:, 0, 1:-1] = boards[:, -1]
+        padded[:, -1, 1:-1] = boards[:, 0]
+        padded[:, :, 0] = padded[:, :, -2]
+        padded[:, :, -1] = padded[:, :, 1]
+    column_sums = padded[:, :-2] + padded[:, 1:-1] + padded[:, 2:]
+    block_sums = column_sums[:, :, :-2] + column_sums[:, :, 1:-1] + column_sums[:, :, 2:]
+    return ((block_sums == 3) | ((block_sums == 4) & (boards == 1))).view(np.uint8)
+
+
+def reframe_boards(boards: np.ndarray, origin: tuple[int, int]) -> tuple[np.ndarray, tuple[int, int]]:
+    """
+    Resizes a stack's shared frame to the live cells of every board plus FRAME_MARGIN on each side.
+
+    The frame is only changed when live cells reach its outer ring, or when it has more than
+    twice FRAME_MARGIN of empty space on a side, so most generations return the stack as is.
+
+    Args:
+        boards (np.ndarray): The (N, H, W) uint8 stack of boards.
+        origin (tuple[int, int]): The (row, column) of the frame's top-left cell.
+
+    Returns:
+        tuple[np.ndarray, tuple[int, int]]: The stack in its new frame and the frame's origin.
+    """
+    live_rows = np.flatnonzero(boards.any(axis=(0, 2)))
+    if live_rows.size == 0:
+        return boards, origin
+    live_cols = np.flatnonzero(boards.any(axis=(0, 1)))
+    height, width = boards.shape[1:]
+    top, bottom = live_rows[0], live_rows[-1]
+    left, right = live_cols[0], live_cols[-1]
+    gaps = (top, height - 1 - bottom, left, width - 1 - right)
+    if min(gaps) >= 1 and max(gaps) <= 2 * FRAME_MARGIN:
+        return boards, origin
+
+    new_top, new_left = top - FRAME_MARGIN, left - FRAME_MARGIN
+    new_boards = np.zeros(
+        (boards.shape[0], bottom - top + 1 + 2 * FRAME_MARGIN, right - left + 1 + 2 * FRAME_MARGIN), dtype=np.uint8
+    )
+    new_boards[:, FRAME_MARGIN:FRAME_MARGIN + bottom - top + 1, FRAME_MARGIN:FRAME_MARGIN + right - left + 1] = (
+        boards[:, top:bottom + 1, left:right + 1]
+    )
+    return new_boards, (origin[0] + int(new_top), origin[1] + int(new_left))
+
+
+def run_games(
+    words: list[str], generations: int = 1000, use_cache: bool = True, topology: str = "infinite"
+) -> list[dict]:
+    """
+    Runs Conway's Game of Life for many words at once, stepping all their boards together.
+
+    The boards are stacked into one (N, H, W) array in a shared frame and stepped with a single
+    vectorized neighbour count. Every generation each board's end conditions are checked as in
+    Simulation, and finished boards are dropped from the stack. A board whose live region grows
+    beyond SPILL_SIZE, usually debris with an escaping glider, would make the shared frame large
+    for every board, so it is finished on its own as a NumpySimulation instead. On the bounded
+    and torus topologies the frame is the ROWS x COLUMNS grid and never changes.
+
+    Args:
+        words (list[str]): The words to convert into initial patterns.
+        generations (int, optional): Maximum number of generations to run. Defaults to 1000.
+        use_cache (bool, optional): Whether to read the lookup table and read and write
+                                    api.cgol.RESULT_CACHE, under the "numpy" engine. Defaults to True.
+        topology (str, optional): The shape of the plane, one of api.cgol.TOPOLOGIES. Defaults to "infinite".
+
+    Returns:
+        list[dict]: The result for each word, in order, as returned by run_game.
+    """
+    cache_key = engine_key("numpy", topology)
+    infinite = topology == "infinite"
+    margin = FRAME_MARGIN if infinite else 0
+    results = [None] * len(words)
+    pending = []
+    for index, word in enumerate(words):
+        cached = cached_result(word, generations, cache_key) if use_cache else None
+        if cached is not None:
+            results[index] = cached
+        else:
+            pending.append(index)
+
+    ids = np.array(pending, dtype=np.int64)
+    boards = np.zeros((len(pending), ROWS + 2 * margin, COLUMNS + 2 * margin), dtype=np.uint8)
+    origin = (-margin, -margin)
+    for k, index in enumerate(pending):
+        for row, col in generate_initial_live_cells(convert_to_ascii_bitmask(words[index])):
+            boards[k, row - origin[0], col - origin[1]] = 1
+    scores = np.zeros(len(pending), dtype=np.int64)
+    seen = [{} for _ in pending]
+    generation = 0
+
+    while generation < generations and len(ids):
+        populations = boards.sum(axis=(1, 2), dtype=np.int64)
+        rows_any = boards.any(axis=2)
+        cols_any = boards.any(axis=1)
+        tops = rows_any.argmax(axis=1)
+        bottoms = rows_any.shape[1] - rows_any[:, ::-1].argmax(axis=1)
+        lefts = cols_any.argmax(axis=1)
+        rights = cols_any.shape[1] - cols_any[:, ::-1].argmax(axis=1)
+
+        keep = np.ones(len(ids), dtype=bool)
+        for k, index in enumerate(ids):
+            if populations[k] == 0:
+                results[index] = {"generations": generation, "score": int(scores[k]), "period": None, "displacement": None}
+                keep[k] = False
+                continue
+
+            board = boards[k, tops[k]:bottoms[k], lefts[k]:rights[k]]
+            corner = (origin[0] + int(tops[k]), origin[1] + int(lefts[k]))
+            if infinite and max(board.shape) > SPILL_SIZE:
+                simulation = resume_simulation(
+                    words[index], generations, board.copy(), corner, generation, int(scores[k]), seen[k]
+                )
+                results[index] = simulation.run()
+                keep[k] = False
+                continue
+
+            key = board_fingerprint(board)
+            if key in seen[k]:
+                first_generation, first_corner = seen[k][key]
+                results[index] = {
+                    "generations": generation,
+                    "score": int(scores[k]),
+                    "period": generation - first_generation,
+                    "displacement": (corner[0] - first_corner[0], corner[1] - first_corner[1]),
+                }
+                keep[k] = False
+                continue
+            seen[k][key] = (generation, corner)
+
+        scores += populations * keep
+        if not keep.all():
+            boards, ids, scores = boards[keep], ids[keep], scores[keep]
+            seen = [history for history, kept in zip(seen, keep) if kept]
+        boards = step_boards(boards, topology)
+        if infinite:
+            boards, origin = reframe_boards(boards, origin)
+        generation += 1
+
+    for k, index in enumerate(ids):
+        results[index] = {"generations": generation, "score": int(scores[k]), "period": None, "displacement": None}
+
+    for index in pending:
+        record_game_metrics(cache_key, results[index])
+    if use_cache:
+        for index in pending:
+            RESULT_CACHE.put(words[index], generations, cache_key, results[index])
+    return results
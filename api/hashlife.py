@@ -0,0 +1,418 @@
+"""HashLife engine
+This module implements HashLife, a memoized quadtree engine for Conway's Game of Life.
+Identical regions of the plane share one canonical node, and each node caches where it
+ends up 2^(level - 2) generations later, so runs can jump ahead by powers of two instead
+of stepping every generation. This makes long runs over patterns that settle into
+periodic debris and escaping gliders cheap, such as scores for a million generations.
+
+Each node also caches the sum of its centre's population over the generations it jumps,
+so the score, which is the sum of the population of every generation, stays exact.
+"""
+
+import time
+
+from api.cgol import Simulation, SimulationTimeout
+
+MAX_NODES = 1 << 18
+MAX_PERIOD = 64
+
+
+class Node:
+    """
+    A square of 2^level x 2^level cells, made of four canonical quadrants.
+
+    Leaves (level 0) are single cells. result and score cache the node's centre half after
+    2^(level - 2) generations and the sum of that centre's population over those generations.
+    """
+
+    __slots__ = ("level", "nw", "ne", "sw", "se", "population", "result", "score")
+
+    def __init__(self, level: int, nw=None, ne=None, sw=None, se=None, population: int = 0):
+        self.level = level
+        self.nw, self.ne, self.sw, self.se = nw, ne, sw, se
+        self.population = population
+        self.result = None
+        self.score = 0
+
+
+DEAD = Node(0, population=0)
+ALIVE = Node(0, population=1)
+
+
+class HashLife:
+    """
+    A table of canonical nodes and the operations that build and advance them.
+
+    Each HashLife owns its own table, so separate runs share no state. When the table grows
+    past max_nodes it is cleared; existing nodes stay valid and keep their cached results,
+    they are just no longer shared with nodes built afterwards.
+    """
+
+    def __init__(self, max_nodes: int = MAX_NODES):
+        """
+        Args:
+            max_nodes (int, optional): Number of canonical nodes kept before the table is cleared.
+                                       Defaults to MAX_NODES.
+        """
+        self.max_nodes = max_nodes
+        self._nodes = {}
+        self._steps = {}
+        self._empty = [DEAD]
+
+    def join(self, nw: Node, ne: Node, sw: Node, se: Node) -> Node:
+        """Returns the canonical node with the given quadrants."""
+        key = (nw, ne, sw, se)
+        node = self._nodes.get(key)
+        if node is None:
+            node = Node(nw.level + 1, nw, ne, sw, se, nw.population + ne.population + sw.population + se.population)
+            self._nodes[key] = node
+        return node
+
+    def empty(self, level: int) -> Node:
+        """Returns the canonical empty node of a level."""
+        while len(self._empty) <= level:
+            smaller = self._empty[-1]
+            self._empty.append(self.join(smaller, smaller, smaller, smaller))
+        return self._empty[level]
+
+    def collect_garbage(self):
+        """Clears the node table and step cache if the table has grown past max_nodes."""
+        if len(self._nodes) > self.max_nodes:
+            self._nodes.clear()
+            self._steps.clear()
+            self._empty = [DEAD]
+
+    def from_cells(self, live_cells: set[tuple[int, int]]) -> tuple[Node, tuple[int, int]]:
+        """
+        Builds a node holding a set of live cells.
+
+        Args:
+            live_cells (set[tuple[int, int]]): Set of (row, column) tuples for live cells.
+
+        Returns:
+            tuple[Node, tuple[int, int]]: The node and the (row, column) of its top-left cell.
+        """
+        if not live_cells:
+            return self.empty(3), (0, 0)
+        rows, cols = zip(*live_cells)
+        origin = (min(rows), min(cols))
+        level = 3
+        while (1 << level) <= max(max(rows) - origin[0], max(cols) - origin[1]):
+            level += 1
+        cells = {(row - origin[0], col - origin[1]) for row, col in live_cells}
+        return self._build(cells, level, 0, 0), origin
+
+    def _build(self, cells: set[tuple[int, int]], level: int, top: int, left: int) -> Node:
+        if level == 0:
+            return ALIVE if (top, left) in cells else DEAD
+        half = 1 << (level - 1)
+        inside = {(row, col) for row, col in cells if top <= row < top + 2 * half and left <= col < left + 2 * half}
+        if not inside:
+            return self.empty(level)
+        return self.join(
+            self._build(inside, level - 1, top, left),
+            self._build(inside, level - 1, top, left + half),
+            self._build(inside, level - 1, top + half, left),
+            self._build(inside, level - 1, top + half, left + half),
+        )
+
+    def to_cells(self, node: Node, origin: tuple[int, int]) -> set[tuple[int, int]]:
+        """
+        Returns the live cells of a node.
+
+        Args:
+            node (Node): The node.
+            origin (tuple[int, int]): The (row, column) of the node's top-left cell.
+
+        Returns:
+            set[tuple[int, int]]: Set of (row, column) tuples for live cells.
+        """
+        live_cells = set()
+        stack = [(node, origin[0], origin[1])]
+        while stack:
+            node, top, left = stack.pop()
+            if node.population == 0:
+                continue
+            if node.level == 0:
+                live_cells.add((top, left))
+                continue
+            half = 1 << (node.level - 1)
+            stack.append((node.nw, top, left))
+            stack.append((node.ne, top, left + half))
+            stack.append((node.sw, top + half, left))
+            stack.append((node.se, top + half, left + half))
+        return live_cells
+
+    def centre(self, node: Node) -> Node:
+        """Returns the centre half of a node, one level down."""
+        return self.join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    def _subnodes(self, node: Node) -> list[list[Node]]:
+        """Returns the 3x3 grid of overlapping nodes, one level down, that tile a node at half-node offsets."""
+        nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+        return [
+            [nw, self.join(nw.ne, ne.nw, nw.se, ne.sw), ne],
+            [self.join(nw.sw, nw.se, sw.nw, sw.ne), self.join(nw.se, ne.sw, sw.ne, se.nw), self.join(ne.sw, ne.se, se.nw, se.ne)],
+            [sw, self.join(sw.ne, se.nw, sw.se, se.sw), se],
+        ]
+
+    def _quarters(self, grid: list[list[Node]]) -> list[Node]:
+        """Returns the four nodes made of 2x2 blocks of a 3x3 grid, centred on the quarters of the grid's centre."""
+        return [
+            self.join(grid[i][j], grid[i][j + 1], grid[i + 1][j], grid[i + 1][j + 1])
+            for i in (0, 1) for j in (0, 1)
+        ]
+
+    def _step_level_2(self, node: Node) -> tuple[Node, int]:
+        """Advances a 4x4 node by one generation, returning its 2x2 centre and its population."""
+        bits = [
+            [node.nw.nw, node.nw.ne, node.ne.nw, node.ne.ne],
+            [node.nw.sw, node.nw.se, node.ne.sw, node.ne.se],
+            [node.sw.nw, node.sw.ne, node.se.nw, node.se.ne],
+            [node.sw.sw, node.sw.se, node.se.sw, node.se.se],
+        ]
+        cells = []
+        for row in (1, 2):
+            for col in (1, 2):
+                neighbours = sum(
+                    bits[row + dr][col + dc].population
+                    for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc
+                )
+                alive = neighbours == 3 or (neighbours == 2 and bits[row][col] is ALIVE)
+                cells.append(ALIVE if alive else DEAD)
+        result = self.join(*cells)
+        return result, result.population
+
+    def result(self, node: Node) -> tuple[Node, int]:
+        """
+        Advances a node of level 2 or more by 2^(level - 2) generations.
+
+        As in standard HashLife, nine overlapping subnodes are advanced by half the jump and
+        regrouped into four nodes centred on the quarters of the centre, which are advanced by the
+        other half. The first half's population sums come from four more nodes centred on the same
+        quarters at generation 0, made of the subnodes' centres.
+
+        Args:
+            node (Node): The node to advance.
+
+        Returns:
+            tuple[Node, int]: The node's centre half after the jump, one level down, and the sum
+                              of the centre's population over generations 1 to 2^(level - 2).
+        """
+        if node.result is not None:
+            return node.result, node.score
+        if node.population == 0:
+            return self.empty(node.level - 1), 0
+        if node.level == 2:
+            node.result, node.score = self._step_level_2(node)
+            return node.result, node.score
+
+        subnodes = self._subnodes(node)
+        centres = [[self.centre(subnode) for subnode in row] for row in subnodes]
+        first_half_score = sum(self.result(quarter)[1] for quarter in self._quarters(centres))
+
+        halfway = [[self.result(subnode)[0] for subnode in row] for row in subnodes]
+        quarters = [self.result(quarter) for quarter in self._quarters(halfway)]
+        node.result = self.join(*(quarter for quarter, _ in quarters))
+        node.score = first_half_score + sum(score for _, score in quarters)
+        return node.result, node.score
+
+    def step(self, node: Node, j: int) -> tuple[Node, int]:
+        """
+        Advances a node by 2^j generations, where j is at most level - 2.
+
+        Args:
+            node (Node): The node to advance.
+            j (int): The base-2 logarithm of the number of generations.
+
+        Returns:
+            tuple[Node, int]: The node's centre half after 2^j generations, one level down, and
+                              the sum of the centre's population over generations 1 to 2^j.
+        """
+        if j == node.level - 2:
+            return self.result(node)
+        if node.population == 0:
+            return self.empty(node.level - 1), 0
+        key = (node, j)
+        if key in self._steps:
+            return self._steps[key]
+
+        centres = [[self.centre(subnode) for subnode in row] for row in self._subnodes(node)]
+        quarters = [self.step(quarter, j) for quarter in self._quarters(centres)]
+        stepped = (self.join(*(quarter for quarter, _ in quarters)), sum(score for _, score in quarters))
+        self._steps[key] = stepped
+        return stepped
+
+    def expand(self, node: Node, origin: tuple[int, int]) -> tuple[Node, tuple[int, int]]:
+        """Returns a node one level up with the given node in its centre, and the new origin."""
+        empty = self.empty(node.level - 1)
+        expanded = self.join(
+            self.join(empty, empty, empty, node.nw),
+            self.join(empty, empty, node.ne, empty),
+            self.join(empty, node.sw, empty, empty),
+            self.join(node.se, empty, empty, empty),
+        )
+        half = 1 << (node.level - 1)
+        return expanded, (origin[0] - half, origin[1] - half)
+
+    def advance(self, node: Node, origin: tuple[int, int], generations: int) -> tuple[Node, tuple[int, int], int]:
+        """
+        Advances a pattern by any number of generations, jumping by powers of two.
+
+        Before each jump the node is padded until its live cells fit in its central quarter, so
+        nothing can travel out of the centre half that the jump returns.
+
+        Args:
+            node (Node): The node holding the pattern.
+            origin (tuple[int, int]): The (row, column) of the node's top-left cell.
+            generations (int): The number of generations to advance.
+
+        Returns:
+            tuple[Node, tuple[int, int], int]: The node holding the advanced pattern, its origin, and
+                the sum of the pattern's population over generations 1 to generations.
+        """
+        total = 0
+        j = 0
+        while generations:
+            if generations & 1:
+                while node.level < j + 3 or self.centre(self.centre(node)).population != node.population:
+                    node, origin = self.expand(node, origin)
+                node, score = self.step(node, j)
+                quarter = 1 << (node.level - 1)
+                origin = (origin[0] + quarter, origin[1] + quarter)
+                total += score
+                self.collect_garbage()
+            generations >>= 1
+            j += 1
+        return node, origin, total
+
+
+def normalize(live_cells: set[tuple[int, int]]) -> tuple[frozenset, tuple[int, int]]:
+    """
+    Returns the shape of a set of live cells, moved so its bounding box starts at (0, 0), and its corner.
+
+    Args:
+        live_cells (set[tuple[int, int]]): Set of (row, column) tuples for live cells.
+
+    Returns:
+        tuple[frozenset, tuple[int, int]]: The translated cells and the bounding box's top-left corner.
+    """
+    if not live_cells:
+        return frozenset(), (0, 0)
+    rows, cols = zip(*live_cells)
+    top, left = min(rows), min(cols)
+    return frozenset((row - top, col - left) for row, col in live_cells), (top, left)
+
+
+class HashLifeSimulation(Simulation):
+    """
+    A Simulation that finds where the game ends with HashLife jumps instead of stepping every generation.
+
+    The result matches Simulation's for patterns that die out or repeat with a period of up to
+    MAX_PERIOD generations; longer periods aren't detected and the game runs to its limit.
+    Extinction and repetition are both permanent once reached, so the first generation at which
+    either happens is found by binary search over positions reached by jumps from the seed.
+    The deadline is checked between searches rather than every generation.
+    """
+
+    def __init__(
+        self,
+        word: str,
+        generations: int = 1000,
+        deadline: float | None = None,
+        topology: str = "infinite",
+        max_nodes: int = MAX_NODES,
+    ):
+        """
+        Args:
+            word (str): The word to convert into the initial pattern.
+            generations (int, optional): Maximum number of generations to run. Defaults to 1000.
+            deadline (float | None, optional): Wall-clock time after which run stops. Defaults to None.
+            topology (str, optional): Must be "infinite", since the quadtree has no edges. Defaults to "infinite".
+            max_nodes (int, optional): Size of the canonical node table. Defaults to MAX_NODES.
+
+        Raises:
+            ValueError: If the topology is not "infinite".
+        """
+        if topology != "infinite":
+            raise ValueError("The hashlife engine only supports the infinite topology")
+        super().__init__(word, generations, deadline, topology)
+        self.life = HashLife(max_nodes)
+        self.seed = self.life.from_cells(self.state)
+
+    def initial_state(self, live_cells: set[tuple[int, int]]) -> set[tuple[int, int]]:
+        return live_cells
+
+    def steps(self):
+        raise NotImplementedError("HashLifeSimulation jumps ahead and doesn't step generation by generation")
+
+    def _board(self, generation: int) -> tuple[set[tuple[int, int]], int]:
+        """Returns the live cells at a generation and the population summed over generations 1 to it."""
+        self._check_deadline()
+        node, origin, total = self.life.advance(*self.seed, generation)
+        return self.life.to_cells(node, origin), total
+
+    def _check_deadline(self):
+        if self.deadline is not None and time.time() > self.deadline:
+            raise SimulationTimeout(f"Simulation of {self.word!r} stopped before it finished")
+
+    def _first(self, predicate, high: int) -> int:
+        """Returns the first generation in [0, high] for which a monotone predicate holds, given it holds at high."""
+        low = 0
+        while low < high:
+            middle = (low + high) // 2
+            if predicate(middle):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def _find_period(self, live_cells: set[tuple[int, int]]) -> int | None:
+        """Returns the smallest period of at most MAX_PERIOD after which live_cells repeat, or None."""
+        shape, _ = normalize(live_cells)
+        node, origin = self.life.from_cells(live_cells)
+        for period in range(1, MAX_PERIOD + 1):
+            node, origin, _ = self.life.advance(node, origin, 1)
+            if normalize(self.life.to_cells(node, origin))[0] == shape:
+                return period
+        return None
+
+    def run(self) -> dict[str, int | tuple[int, int] | None]:
+        """
+        Runs the simulation to the end and returns its result.
+
+        Returns:
+            dict[str, int | tuple[int, int] | None]: The result, as returned by Simulation.result.
+
+        Raises:
+            SimulationTimeout: If the deadline passes before the simulation finishes.
+        """
+        if self.generations <= 0 or self.population() == 0:
+            return self.result()
+
+        last = self.generations - 1
+        last_cells, _ = self._board(last)
+        end = self.generations
+        if not last_cells:
+            end = self._first(lambda generation: not self._board(generation)[0], last)
+        else:
+            period = self._find_period(last_cells)
+            if period is not None:
+                def repeats(generation: int) -> bool:
+                    start = self._board(generation)[0]
+                    node, origin = self.life.from_cells(start)
+                    node, origin, _ = self.life.advance(node, origin, period)
+                    return normalize(self.life.to_cells(node, origin))[0] == normalize(start)[0]
+
+                first_repeat = self._first(repeats, last)
+                if first_repeat + period <= last:
+                    end = first_repeat + period
+                    start_corner = normalize(self._board(first_repeat)[0])[1]
+                    end_corner = normalize(self._board(end)[0])[1]
+                    self.period = period
+                    self.displacement = (end_corner[0] - start_corner[0], end_corner[1] - start_corner[1])
+
+        end_cells, total = self._board(end)
+        self.generation = end
+        self.score = self.population() + total - len(end_cells)
+        return self.result()
@@ -0,0 +1,185 @@
+"""Precomputed lookup table for run_game
+This module reads and builds a binary table of run_game results for a fixed list of
+words, such as a dictionary of common short words. A game is fully determined by its
+word, so the results can be computed offline once and then read at no simulation cost.
+
+The file is a header followed by fixed-width records sorted by key. Each key is the
+word's UTF-8 bytes padded with NULs to KEY_SIZE. The table is memory-mapped and searched
+in place, so opening it reads nothing but the header, and a lookup only decodes the one
+record it finds. A table holds the results for one generation limit and engine.
+"""
+
+import mmap
+import os
+import struct
+import threading
+from collections.abc import Iterable
+
+MAGIC = b"CGOLLUT\0"
+VERSION = 1
+KEY_SIZE = 16
+# Magic, version, key size, generation limit, record count and engine key
+HEADER = struct.Struct("<8sHHIQ24s")
+# Key, generations, score, period (-1 for None) and displacement
+RECORD = struct.Struct(f"<{KEY_SIZE}sIQiii")
+LOOKUP_PATH = os.environ.get("CGOL_LOOKUP_PATH")
+
+_lookup_table = None
+_lookup_table_lock = threading.Lock()
+
+
+def encode_key(word: str) -> bytes | None:
+    """
+    Returns the table key for a word, or None if the word can't be stored in a table.
+
+    Args:
+        word (str): The word.
+
+    Returns:
+        bytes | None: The word's UTF-8 bytes padded with NULs to KEY_SIZE, or None if they are
+                      longer than KEY_SIZE or contain a NUL.
+    """
+    key = word.encode("utf-8")
+    if len(key) > KEY_SIZE or b"\0" in key:
+        return None
+    return key.ljust(KEY_SIZE, b"\0")
+
+
+class LookupTable:
+    """A memory-mapped lookup table of run_game results, written by build_lookup_table."""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Path of the table file.
+
+        Raises:
+            ValueError: If the file isn't a lookup table of this version, or is truncated.
+        """
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            raise ValueError(f"{path} is not a lookup table")
+        magic, version, key_size, generations, count, engine = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION or key_size != KEY_SIZE:
+            raise ValueError(f"{path} is not a version {VERSION} lookup table")
+        if len(self._map) != HEADER.size + count * RECORD.size:
+            raise ValueError(f"{path} is truncated")
+        self.path = path
+        self.generations = generations
+        self.engine = engine.rstrip(b"\0").decode("ascii")
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get(self, word: str, generations: int, engine: str) -> dict | None:
+        """
+        Returns a game's result from the table, or None if the table doesn't hold it.
+
+        Args:
+            word (str): The word the game is seeded with.
+            generations (int): The generation limit of the game.
+            engine (str): The engine and topology of the game, as returned by api.cgol.engine_key.
+
+        Returns:
+            dict | None: The result, as returned by run_game, or None on a miss.
+        """
+        if generations != self.generations or engine != self.engine:
+            return None
+        key = encode_key(word)
+        if key is None:
+            return None
+
+        data = self._map
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            offset = HEADER.size + middle * RECORD.size
+            if data[offset:offset + KEY_SIZE] < key:
+                low = middle + 1
+            else:
+                high = middle
+        offset = HEADER.size + low * RECORD.size
+        if low == self._count or data[offset:offset + KEY_SIZE] != key:
+            return None
+
+        _, generations, score, period, row, col = RECORD.unpack_from(data, offset)
+        if period < 0:
+            return {"generations": generations, "score": score, "period": None, "displacement": None}
+        return {"generations": generations, "score": score, "period": period, "displacement": (row, col)}
+
+    def close(self):
+        self._map.close()
+
+
+def get_lookup_table() -> LookupTable | None:
+    """
+    Returns the table at CGOL_LOOKUP_PATH, opening it on first use.
+
+    Returns:
+        LookupTable | None: The shared lookup table, or None if CGOL_LOOKUP_PATH isn't set.
+    """
+    global _lookup_table
+    if _lookup_table is not None or LOOKUP_PATH is None:
+        return _lookup_table
+    with _lookup_table_lock:
+        if _lookup_table is None:
+            _lookup_table = LookupTable(LOOKUP_PATH)
+        return _lookup_table
+
+
+def build_lookup_table(
+    words: Iterable[str],
+    path: str,
+    generations: int = 1000,
+    engine: str = "set",
+    topology: str = "infinite",
+    executor=None,
+) -> int:
+    """
+    Runs the game for each word and writes the results to a lookup table.
+
+    The games run in the game executor from api.batch, with one worker per core. Repeated
+    words are run once. Words whose key would be longer than KEY_SIZE bytes are skipped.
+    The table is written to a temporary file that then replaces path, so a server
+    reading the old table is never handed a partly written one.
+
+    Args:
+        words (Iterable[str]): The words to precompute.
+        path (str): Path to write the table to.
+        generations (int, optional): Maximum number of generations to run. Defaults to 1000.
+        engine (str, optional): The stepping engine, one of api.cgol.ENGINES. Defaults to "set".
+        topology (str, optional): The shape of the plane, one of api.cgol.TOPOLOGIES. Defaults to "infinite".
+        executor (Executor | None, optional): The executor to run games in. Defaults to the
+                                              shared game executor.
+
+    Returns:
+        int: The number of records written.
+
+    Raises:
+        ValueError: If the engine or topology is unknown, or the engine doesn't support the topology.
+    """
+    from api.batch import iter_batch_results
+    from api.cgol import engine_key, get_simulation_class
+
+    get_simulation_class(engine, topology)
+    keys = {}
+    for word in words:
+        key = encode_key(word)
+        if key is not None:
+            keys[key] = word
+    ordered = sorted(keys)
+
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, KEY_SIZE, generations, len(ordered), engine_key(engine, topology).encode("ascii")))
+        results = iter_batch_results(
+            (keys[key] for key in ordered), generations, engine, executor=executor, topology=topology
+        )
+        for key, (_, result) in zip(ordered, results):
+            period = -1 if result["period"] is None else result["period"]
+            row, col = result["displacement"] or (0, 0)
+            file.write(RECORD.pack(key, result["generations"], result["score"], period, row, col))
+    os.replace(temporary_path, path)
+    return len(ordered)
@@ -4,24 +4,67 @@ It defines endpoints for the homepage and for running the game logic, and handle
 interaction with the OpenAI API through the ai_client.wrapper.
 """
 from pprint import pprint
+import json
 import os
-from fastapi import FastAPI, Form, Request
+from fastapi import FastAPI, Form, Query, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse,  HTMLResponse
+from fastapi.responses import JSONResponse,  HTMLResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
+from starlette.datastructures import Headers
 from pydantic import BaseModel
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 from dotenv import load_dotenv
-from ai_client.wrapper import client_response, ServerError, OpenAIServerError
+from api.cgol import Simulation, get_simulation_class
+from api.batch import iter_batch_results, parse_words
+from api import metrics
+from api.profiling import PROFILE_HEADER, PROFILE_REQUESTED, sample_request
+from ai_client.wrapper import async_client_response, stream_client_response, ServerError, OpenAIServerError, ResponseTimeout
 
 load_dotenv(override=True)
 
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 PASSWORD = os.environ.get("PASSWORD")
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+OPENAI_MAX_CONNECTIONS = int(os.environ.get("OPENAI_MAX_CONNECTIONS", 100))
+RESPONSE_TIMEOUT = float(os.environ.get("CGOL_RESPONSE_TIMEOUT", 60))
+
+# One client, and so one pooled HTTP connection pool, shared by every request
+client = AsyncOpenAI(
+    api_key=OPENAI_API_KEY,
+    http_client=DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=OPENAI_MAX_CONNECTIONS,
+        )
+    ),
+)
+
+
+class ProfileMiddleware:
+    """
+    ASGI middleware that marks the requests whose games api.profiling should profile.
+
+    A request is marked if it sends an X-Profile header of 1, true or yes, or, without the
+    header, if it is sampled at CGOL_PROFILE_RATE. Nothing is profiled unless CGOL_PROFILE_DIR is set.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = PROFILE_REQUESTED.set(sample_request(Headers(scope=scope).get(PROFILE_HEADER)))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            PROFILE_REQUESTED.reset(token)
+
 
 app = FastAPI()
+app.add_middleware(ProfileMiddleware)
 templates = Jinja2Templates(directory="api/templates")
 app.mount("/static", StaticFiles(directory="api/static"), name="static")
 
@@ -41,9 +84,9 @@ def homepage(request: Request):
 
 
 @app.post("/results", status_code=201)
-def run_cgol_game(user_input: str =  Form(...)):
+async def run_cgol_game(user_input: str =  Form(...)):
     """
-    Processes user input from the frontend, calls the client_response function to interact
+    Processes user input from the frontend, awaits the async_client_response function to interact
     with the OpenAI API, and returns the game results as a JSON response.
 
     Args:
@@ -55,9 +98,145 @@ def run_cgol_game(user_input: str =  Form(...)):
     try:
         if not user_input:
             return JSONResponse(content={"server_response": "Invalid user input"})
-        server_response = client_response(client, user_input=user_input)
+        server_response = await async_client_response(client, user_input=user_input, timeout=RESPONSE_TIMEOUT)
         return JSONResponse(content={"server_response": server_response}, status_code=201)
-    
+
+    except ResponseTimeout as e:
+        return JSONResponse(
+            content={"server_response": "The request took too long to answer. Try asking about fewer words."},
+            status_code=504,
+        )
+
     except (ServerError, OpenAIServerError) as e:
         return JSONResponse(content={"server_response": "Internal Server Error"}, status_code=500)
 
+
+def format_sse(event: str, data) -> str:
+    """
+    Formats one server-sent event.
+
+    Args:
+        event (str): The event name.
+        data: The event payload, encoded as JSON.
+
+    Returns:
+        str: The event in text/event-stream format.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/results/stream")
+async def stream_cgol_game(user_input: str = Form(...)):
+    """
+    Streaming variant of /results that sends server-sent events as the response is produced.
+
+    Events are 'result' as each game finishes, 'token' for each piece of the model's answer,
+    then 'done', or 'error' with a message if the response fails part way.
+
+    Args:
+        user_input (str): The word or prompt submitted by the user.
+
+    Returns:
+        StreamingResponse: A text/event-stream response.
+    """
+    if not user_input:
+        return JSONResponse(content={"server_response": "Invalid user input"})
+
+    async def events():
+        try:
+            async for event, data in stream_client_response(client, user_input=user_input, timeout=RESPONSE_TIMEOUT):
+                yield format_sse(event, data)
+            yield format_sse("done", None)
+
+        except ResponseTimeout as e:
+            yield format_sse("error", "The request took too long to answer. Try asking about fewer words.")
+
+        except (ServerError, OpenAIServerError) as e:
+            yield format_sse("error", "Internal Server Error")
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.get("/generations")
+def stream_generations(
+    word: str = Query(..., max_length=60),
+    generations: int = Query(1000, ge=0, le=10000),
+    topology: str = Query("infinite"),
+):
+    """
+    Streams a game generation by generation as newline-delimited JSON, for clients that animate a run.
+
+    Each line but the last is a delta with the generation number and the [row, column] cells born
+    and died, starting with generation 0 whose born cells are the seed. The last line holds the
+    game's result under the key 'result'.
+
+    Args:
+        word (str): The word to convert into the initial pattern.
+        generations (int): Maximum number of generations to run.
+        topology (str): The shape of the plane, one of api.cgol.TOPOLOGIES.
+
+    Returns:
+        StreamingResponse: An application/x-ndjson response, or a 400 JSONResponse for an unknown topology.
+    """
+    try:
+        get_simulation_class("set", topology)
+    except ValueError as e:
+        return JSONResponse(content={"server_response": str(e)}, status_code=400)
+    simulation = Simulation(word, generations, topology=topology)
+
+    def lines():
+        for delta in simulation.iter_generations():
+            yield json.dumps(delta, separators=(",", ":")) + "\n"
+        yield json.dumps({"result": simulation.result()}, separators=(",", ":")) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.post("/batch")
+async def batch_score(
+    request: Request,
+    generations: int = Query(1000, ge=0, le=10000),
+    engine: str = Query("set"),
+    topology: str = Query("infinite"),
+):
+    """
+    Scores many words without the LLM, streaming the results back as newline-delimited JSON.
+
+    The request body is a word list or a JSONL file, one word per line (see api.batch.parse_words).
+    Each output line is the word and its game result, in the same order as the input.
+
+    Args:
+        request (Request): The incoming HTTP request, whose body holds the words.
+        generations (int): Maximum number of generations per game.
+        engine (str): The stepping engine, one of api.cgol.ENGINES.
+        topology (str): The shape of the plane, one of api.cgol.TOPOLOGIES.
+
+    Returns:
+        StreamingResponse: An application/x-ndjson response, or a 400 JSONResponse for invalid input.
+    """
+    try:
+        get_simulation_class(engine, topology)
+        body = (await request.body()).decode("utf-8")
+        words = list(parse_words(body.splitlines()))
+    except (ValueError, UnicodeDecodeError) as e:
+        return JSONResponse(content={"server_response": str(e)}, status_code=400)
+
+    # The lines are produced on a worker thread, so read the request's profiling mark here
+    profile = PROFILE_REQUESTED.get()
+
+    def lines():
+        for word, result in iter_batch_results(words, generations, engine, topology=topology, profile=profile):
+            yield json.dumps({"word": word, **result}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.get("/metrics")
+def export_metrics():
+    """
+    Exports the server's metrics in the Prometheus text exposition format, for scraping.
+
+    Returns:
+        Response: The metrics from api.metrics, as text/plain.
+    """
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,273 @@
+"""Prometheus-style metrics
+This module keeps counters and histograms in process and renders them in the Prometheus
+text exposition format for the /metrics endpoint. Recording a sample is a dict update
+under a lock, so the instrumentation is cheap enough to leave on in production.
+
+Games often run in the spawn process pool from api.batch, whose workers have their own
+copy of every metric. Tasks run there through call_with_metrics, which sends the worker's
+samples back with the result so that merge_metrics can add them to the server's metrics.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_worker_process = False
+
+
+class Metric:
+    """
+    A named metric whose samples are kept per combination of label values.
+
+    Label values are passed as keyword arguments and must name every label in labelnames.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        """
+        Args:
+            name (str): The metric name, as exported.
+            documentation (str): The HELP text.
+            labelnames (tuple[str, ...], optional): The names of the metric's labels. Defaults to ().
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        """Returns the (name, labels, value) samples to export, one per line of the exposition."""
+        raise NotImplementedError
+
+    def drain(self) -> dict:
+        """Returns the recorded values and resets the metric."""
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values: dict):
+        """Adds values returned by drain, usually in another process, to the metric."""
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """A metric that only goes up, such as a number of games or cells."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        """
+        Adds to the counter.
+
+        Args:
+            amount (float, optional): The amount to add. Defaults to 1.
+            **labels: The value of each of the metric's labels.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        """Returns the counter's current value for the given labels."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in values]
+
+    def merge(self, values: dict):
+        with self._lock:
+            for key, amount in values.items():
+                self._values[key] = self._values.get(key, 0) + amount
+
+
+class Histogram(Metric):
+    """
+    A metric that counts observations, such as durations, into buckets.
+
+    Each bucket counts the observations less than or equal to its upper bound, and the
+    sum and count of all observations are exported alongside the buckets.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        """
+        Args:
+            name (str): The metric name, as exported.
+            documentation (str): The HELP text.
+            labelnames (tuple[str, ...], optional): The names of the metric's labels. Defaults to ().
+            buckets (tuple[float, ...], optional): The bucket upper bounds, in increasing order.
+                                                   Defaults to DEFAULT_BUCKETS.
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        """
+        Records an observation.
+
+        Args:
+            value (float): The observed value.
+            **labels: The value of each of the metric's labels.
+        """
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            values = self._values.get(key)
+            if values is None:
+                # One count per bucket and one for +Inf, then the sum of the observations
+                values = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            values[index] += 1
+            values[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observes the seconds taken by the body of a with statement, even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        """Returns the number of observations recorded for the given labels."""
+        with self._lock:
+            values = self._values.get(self._key(labels))
+            return 0 if values is None else sum(values[:-1])
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        with self._lock:
+            values = sorted((key, list(counts)) for key, counts in self._values.items())
+        samples = []
+        for key, counts in values:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", {**labels, "le": format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_sum", labels, counts[-1]))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+    def merge(self, values: dict):
+        with self._lock:
+            for key, counts in values.items():
+                current = self._values.get(key)
+                if current is None:
+                    self._values[key] = list(counts)
+                else:
+                    for index, count in enumerate(counts):
+                        current[index] += count
+
+
+REGISTRY: list[Metric] = []
+
+GAMES = Counter("cgol_games_total", "Games simulated, not counting cache hits.", ("engine",))
+GAME_SECONDS = Histogram("cgol_game_seconds", "Seconds taken to simulate one game.", ("engine",))
+GENERATIONS = Counter("cgol_generations_total", "Generations simulated.", ("engine",))
+CELLS = Counter("cgol_cells_total", "Live cells processed, summed over every generation simulated.", ("engine",))
+CACHE_LOOKUPS = Counter("cgol_cache_lookups_total", "run_game result cache lookups.", ("result",))
+SINGLE_FLIGHT_CALLS = Counter(
+    "cgol_single_flight_calls_total",
+    "Calls for an in-flight computation: result=leader started it, result=coalesced shared another call's.",
+    ("flight", "result"),
+)
+LOOKUP_TABLE_HITS = Counter("cgol_lookup_table_hits_total", "run_game results read from the precomputed lookup table.")
+RESPONSE_CACHE_LOOKUPS = Counter("cgol_response_cache_lookups_total", "Answer cache lookups for prompts.", ("result",))
+ROUTED_PROMPTS = Counter("cgol_routed_prompts_total", "Prompts answered by the local router, without the LLM.")
+TOOL_CALLS = Counter("cgol_tool_calls_total", "run_game calls requested by the model.")
+RESPONSE_SECONDS = Histogram("cgol_response_seconds", "Seconds taken to answer a prompt, from the first LLM call to the answer.")
+RESPONSE_PHASE_SECONDS = Histogram(
+    "cgol_response_phase_seconds",
+    "Seconds spent in each phase of answering a prompt: first_llm_call, simulations and followup_llm_call.",
+    ("phase",),
+)
+
+
+def format_value(value: float) -> str:
+    """Formats a sample value or bucket bound as Prometheus expects it."""
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def escape_label(value: str) -> str:
+    """Escapes a label value for the text exposition format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render() -> str:
+    """
+    Renders every registered metric in the Prometheus text exposition format.
+
+    Returns:
+        str: The exposition, ending with a newline.
+    """
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples():
+            if labels:
+                label_text = ",".join(f'{label}="{escape_label(text)}"' for label, text in labels.items())
+                name = f"{name}{{{label_text}}}"
+            lines.append(f"{name} {format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def mark_worker_process():
+    """Marks this process as a game worker, whose samples are sent back by call_with_metrics. Used as a pool initializer."""
+    global _worker_process
+    _worker_process = True
+
+
+def call_with_metrics(function, *args, **kwargs) -> tuple[object, dict | None]:
+    """
+    Calls a function and returns its result with the samples it recorded in a game worker.
+
+    In a process marked with mark_worker_process, every metric is drained after the call, so
+    the samples can be pickled back with the result. Anywhere else the samples were recorded
+    straight into this process's metrics, and None is returned in their place.
+
+    Args:
+        function: The function to call.
+        *args: Positional arguments for the function.
+        **kwargs: Keyword arguments for the function.
+
+    Returns:
+        tuple[object, dict | None]: The function's result and the samples to pass to merge_metrics.
+    """
+    result = function(*args, **kwargs)
+    if not _worker_process:
+        return result, None
+    return result, {metric.name: values for metric in REGISTRY if (values := metric.drain())}
+
+
+def merge_metrics(samples: dict | None):
+    """Adds samples returned by call_with_metrics to this process's metrics."""
+    if not samples:
+        return
+    for metric in REGISTRY:
+        if metric.name in samples:
+            metric.merge(samples[metric.name])
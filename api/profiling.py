@@ -0,0 +1,166 @@
+"""Opt-in profiling of the simulation
+This module profiles games for a fraction of requests and writes the profiles to a
+directory, so real prompts can guide engine work without redeploying with a profiler
+attached. Profiling is off unless CGOL_PROFILE_DIR is set. The "pstats" mode runs
+cProfile and writes files that pstats, snakeviz and similar tools read. The
+"collapsed" mode samples the profiled thread's stack and writes collapsed stacks, one
+"frame;frame;frame count" line per stack, for flamegraph.pl or speedscope.
+
+A request is profiled if it is sampled at CGOL_PROFILE_RATE or sends an X-Profile
+header; api.main marks it with PROFILE_REQUESTED. Games that run in the process pool
+don't see that mark, so callers pass profile=True to run_game explicitly.
+"""
+
+import cProfile
+import itertools
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+PROFILE_DIR = os.environ.get("CGOL_PROFILE_DIR")
+PROFILE_RATE = float(os.environ.get("CGOL_PROFILE_RATE", 0))
+PROFILE_MODE = os.environ.get("CGOL_PROFILE_MODE", "pstats")
+PROFILE_MODES = ("pstats", "collapsed")
+PROFILE_HEADER = "X-Profile"
+SAMPLE_INTERVAL = 0.001
+
+PROFILE_REQUESTED = ContextVar("profile_requested", default=False)
+
+_active = threading.local()
+_sequence = itertools.count()
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack at a fixed interval from a background thread.
+
+    The sampler only runs when the profiled thread releases the GIL, at least every
+    sys.getswitchinterval() seconds, so samples are taken about that often at most.
+    """
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        """
+        Args:
+            thread_id (int): The ident of the thread to sample.
+            interval (float, optional): Seconds between samples. Defaults to SAMPLE_INTERVAL.
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="cgol-stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """Returns the samples as collapsed stacks, root frame first, one stack per line."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def should_profile(profile: bool | None = None) -> bool:
+    """
+    Returns whether to profile now.
+
+    Args:
+        profile (bool | None, optional): True or False to decide explicitly, or None to follow
+                                         PROFILE_REQUESTED. Defaults to None.
+
+    Returns:
+        bool: Whether profiling is configured and was asked for, and no profile is already running
+              on this thread.
+    """
+    if not PROFILE_DIR or getattr(_active, "profiling", False):
+        return False
+    return PROFILE_REQUESTED.get() if profile is None else profile
+
+
+def sample_request(header: str | None) -> bool:
+    """
+    Decides whether to profile a request, from its X-Profile header and CGOL_PROFILE_RATE.
+
+    Args:
+        header (str | None): The value of the request's X-Profile header, or None if it has none.
+
+    Returns:
+        bool: Whether the request's games should be profiled.
+    """
+    if not PROFILE_DIR:
+        return False
+    if header is not None:
+        return header.strip().lower() in ("1", "true", "yes")
+    return random.random() < PROFILE_RATE
+
+
+def profile_path(label: str, extension: str) -> str:
+    """Returns a new file path in PROFILE_DIR for a profile of label, creating the directory if needed."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    label = re.sub(r"[^A-Za-z0-9_.-]+", "_", label)
+    name = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{next(_sequence)}-{label}.{extension}"
+    return os.path.join(PROFILE_DIR, name)
+
+
+@contextmanager
+def profiled(label: str, profile: bool | None = None):
+    """
+    Profiles the body of a with statement, if should_profile says to, and writes the profile.
+
+    The profile is written to PROFILE_DIR as a .pstats file or, in the "collapsed" mode, a
+    .folded file, even if the body raises. Profiles don't nest: inside a profiled body,
+    further profiled statements on the same thread do nothing.
+
+    Args:
+        label (str): A name for what is profiled, used in the file name.
+        profile (bool | None, optional): Passed to should_profile. Defaults to None.
+
+    Raises:
+        ValueError: If CGOL_PROFILE_MODE isn't one of PROFILE_MODES.
+    """
+    if not should_profile(profile):
+        yield
+        return
+    if PROFILE_MODE not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode {PROFILE_MODE!r}, expected one of {', '.join(PROFILE_MODES)}")
+
+    _active.profiling = True
+    try:
+        if PROFILE_MODE == "pstats":
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                profiler.dump_stats(profile_path(label, "pstats"))
+        else:
+            sampler = StackSampler(threading.get_ident())
+            sampler.start()
+            try:
+                yield
+            finally:
+                sampler.stop()
+                with open(profile_path(label, "folded"), "w", encoding="utf-8") as file:
+                    file.write(sampler.collapsed())
+    finally:
+        _active.profiling = False
@@ -0,0 +1,117 @@
+"""Single-flight coalescing of identical computations
+This module lets concurrent callers that want the same result share one computation.
+The first caller for a key becomes the leader and computes the result; callers that
+arrive while it is in flight become followers and wait on the leader's future instead of
+starting their own. Once the computation finishes the key is forgotten, so later callers
+start afresh, normally finding the result in a cache.
+
+The shared futures are concurrent.futures.Future objects, so threads wait on them with
+result() and event loops await them through asyncio.wrap_future, wrapped in
+asyncio.shield so that a caller giving up doesn't cancel the others' future.
+"""
+
+import threading
+from collections.abc import Callable, Hashable
+from concurrent.futures import CancelledError, Future
+
+from api import metrics
+
+
+class SingleFlight:
+    """A table of in-flight computations, keyed by what they compute."""
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name (str): A name for the table, used as the 'flight' label of its metrics.
+        """
+        self.name = name
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._futures)
+
+    def join(self, key: Hashable) -> tuple[Future, bool]:
+        """
+        Joins the computation in flight for key, or starts one.
+
+        A leader must finish the returned future with run or follow; followers only wait on it.
+        Calls are counted in api.metrics under result "leader" or "coalesced".
+
+        Args:
+            key (Hashable): What is being computed.
+
+        Returns:
+            tuple[Future, bool]: The shared future and whether the caller is the leader.
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            leader = future is None
+            if leader:
+                future = self._futures[key] = Future()
+        metrics.SINGLE_FLIGHT_CALLS.inc(flight=self.name, result="leader" if leader else "coalesced")
+        return future, leader
+
+    def _forget(self, key: Hashable, future: Future):
+        with self._lock:
+            if self._futures.get(key) is future:
+                del self._futures[key]
+
+    def run(self, key: Hashable, future: Future, function: Callable, *args, **kwargs):
+        """
+        Computes a leader's result on the current thread and shares it with the followers.
+
+        Args:
+            key (Hashable): The key passed to join.
+            future (Future): The future returned by join.
+            function (Callable): The computation.
+            *args: Positional arguments for function.
+            **kwargs: Keyword arguments for function.
+
+        Returns:
+            The result of function, which followers also receive.
+
+        Raises:
+            Exception: Whatever function raises, which followers also receive.
+        """
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._forget(key, future)
+
+    def follow(self, key: Hashable, future: Future, task: Future, transform: Callable | None = None):
+        """
+        Shares the outcome of a leader's task, such as a game submitted to the process pool.
+
+        When the task finishes, its result, passed through transform if given, or its exception
+        is set on the shared future. If the task is cancelled, so is the shared future.
+
+        Args:
+            key (Hashable): The key passed to join.
+            future (Future): The future returned by join.
+            task (Future): The leader's task.
+            transform (Callable | None, optional): Applied to the task's result before sharing it.
+                                                   Defaults to None.
+        """
+        def finish(task: Future):
+            try:
+                result = task.result()
+                if transform is not None:
+                    result = transform(result)
+            except CancelledError:
+                future.cancel()
+            except BaseException as error:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+            self._forget(key, future)
+
+        task.add_done_callback(finish)
@@ -1,24 +1,68 @@
 const form = document.getElementById("cgolForm");
 const responseRenderArea = document.getElementById("responseRenderArea");
 
+function renderEvent(event, data, answer, results) {
+  if (event === "result") {
+    const item = document.createElement("li");
+    item.textContent = `${data.word}: ${data.result.generations} generations, score ${data.result.score}`;
+    results.appendChild(item);
+  } else if (event === "token") {
+    answer.textContent += data;
+  } else if (event === "error") {
+    answer.textContent = data;
+  }
+}
+
+async function readEvents(response, onEvent) {
+  // EventSource only supports GET, so parse the text/event-stream body by hand
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value;
+    const messages = buffer.split("\n\n");
+    buffer = messages.pop();
+    for (const message of messages) {
+      let event = "message";
+      let data = "";
+      for (const line of message.split("\n")) {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      }
+      onEvent(event, JSON.parse(data));
+    }
+  }
+}
+
 form.addEventListener("submit", async (event) => {
   event.preventDefault();
   document.getElementById("submit_button").classList.add("loading");
   const formData = new FormData(form);
-  const userInput = formData.get("user_input");
 
-  const response = await fetch("/results", {
+  const response = await fetch("/results/stream", {
     method: "POST",
     body: formData,
   });
-  document.getElementById("submit_button").classList.remove("loading");
 
-  if (response.ok) {
-    const data = await response.json();
-    responseRenderArea.textContent = data.server_response || "Please enter a valid prompt";
+  if (response.ok && response.headers.get("Content-Type").startsWith("text/event-stream")) {
+    const results = document.createElement("ul");
+    results.className = "results";
+    const answer = document.createElement("div");
+    responseRenderArea.replaceChildren(results, answer);
 
+    let first = true;
+    await readEvents(response, (event, data) => {
+      if (first) {
+        document.getElementById("submit_button").classList.remove("loading");
+        first = false;
+      }
+      renderEvent(event, data, answer, results);
+    });
+    document.getElementById("submit_button").classList.remove("loading");
   } else {
+    document.getElementById("submit_button").classList.remove("loading");
     const data = await response.json();
-    responseRenderArea.textContent = data.server_response;
+    responseRenderArea.textContent = data.server_response || "Please enter a valid prompt";
   }
 });
@@ -0,0 +1,31 @@
+import argparse
+import contextlib
+import json
+import sys
+from api.batch import iter_batch_results, parse_words
+from api.cgol import ENGINES, TOPOLOGIES
+
+
+def open_stream(path: str, mode: str, standard_stream):
+    if path == "-":
+        return contextlib.nullcontext(standard_stream)
+    return open(path, mode, encoding="utf-8")
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Score many words with Conway's Game of Life, without the LLM.")
+    parser.add_argument("input", nargs="?", default="-", help="Word list or JSONL file, or - for stdin (default)")
+    parser.add_argument("-o", "--output", default="-", help="File to write JSONL results to, or - for stdout (default)")
+    parser.add_argument("--generations", type=int, default=1000, help="Maximum generations per game (default 1000)")
+    parser.add_argument("--engine", choices=ENGINES, default="set", help="Stepping engine (default set)")
+    parser.add_argument("--topology", choices=TOPOLOGIES, default="infinite", help="Shape of the plane (default infinite)")
+    args = parser.parse_args(argv)
+
+    with open_stream(args.input, "r", sys.stdin) as source, open_stream(args.output, "w", sys.stdout) as target:
+        results = iter_batch_results(parse_words(source), args.generations, args.engine, topology=args.topology)
+        for word, result in results:
+            target.write(json.dumps({"word": word, **result}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+import pytest
+
+
+@pytest.fixture(scope="session")
+def fake_responses_server():
+    from tests.fake_openai import FakeResponsesServer
+
+    server = FakeResponsesServer()
+    server.start()
+    yield server
+    server.stop()
@@ -0,0 +1,14 @@
+"""Fixed word corpus for the benchmarks
+Changing these words changes every benchmark's baseline, so add new corpora rather than
+editing this one. The words mix ones that die out or settle quickly with ones that throw
+off gliders and run to the generation limit.
+"""
+
+WORDS = [
+    "monument", "blunt", "HELLO", "OpenAI", "Life", "A", "zq", "cat",
+    "glider", "conway", "pattern", "oscillator", "python", "fastapi", "numpy", "quadtree",
+    "benchmark", "latency", "throughput", "cache", "score", "period", "spaceship", "blinker",
+    "toad", "beacon", "pulsar", "Gosper", "acorn", "diehard", "R-pentomino", "still life",
+    "x7Kp", "Q9", "aB3dE", "mN0pQr", "Zz", "h4ck", "Y2k", "w0rd",
+    "The quick brown fox", "jumps over", "the lazy dog", "0123456789", "!@#$%", "~~~~", "MiXeD", "END",
+]
@@ -0,0 +1,37 @@
+"""Extra benchmark metrics
+Helpers that add throughput, latency percentiles and peak memory to pytest-benchmark results.
+"""
+
+import resource
+
+
+def percentile(ordered: list[float], percent: float) -> float:
+    """Returns the nearest-rank percentile of an ascending list of timings."""
+    index = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def record_metrics(benchmark, generations: float = 0, cells: float = 0):
+    """
+    Adds throughput, latency percentiles and peak RSS to a finished benchmark's extra_info.
+
+    pytest-benchmark reports min, mean and median itself; these are saved alongside them in the
+    JSON written by --benchmark-autosave or --benchmark-save, so they can be compared later.
+
+    Args:
+        benchmark: The pytest-benchmark fixture, after the benchmark has run.
+        generations (float, optional): Generations computed per call, on average.
+        cells (float, optional): Live cells processed per call, on average; for a game this is its score.
+    """
+    if benchmark.disabled or benchmark.stats is None:
+        return
+    stats = benchmark.stats.stats
+    ordered = sorted(stats.data)
+    benchmark.extra_info["p50_ms"] = percentile(ordered, 50) * 1000
+    benchmark.extra_info["p99_ms"] = percentile(ordered, 99) * 1000
+    if generations:
+        benchmark.extra_info["generations_per_sec"] = generations / stats.mean
+    if cells:
+        benchmark.extra_info["cells_per_sec"] = cells / stats.mean
+    # ru_maxrss is in kilobytes on Linux and is the peak of the whole benchmark process so far
+    benchmark.extra_info["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
@@ -0,0 +1,44 @@
+import itertools
+
+import pytest
+from fastapi.testclient import TestClient
+from openai import AsyncOpenAI
+from unittest.mock import patch
+
+from ai_client.response_cache import ResponseCache
+from api.main import app
+from benchmarks.metrics import record_metrics
+from benchmarks.corpus import WORDS
+
+PROMPTS = {
+    "one word": lambda word: f"score '{word}'",
+    "three words": lambda word: f"score '{word}', 'monument' and 'blunt'",
+}
+
+
+@pytest.mark.parametrize("routed", [False, True], ids=["llm", "routed"])
+@pytest.mark.parametrize("prompt", PROMPTS)
+def test_results_end_to_end(benchmark, fake_responses_server, prompt, routed):
+    """
+    Times POST /results against the local fake of the Responses API.
+
+    Through the LLM, each request makes two Responses round trips, dispatches the tool calls and
+    runs the games; routed, the local router runs the games and answers from a template.
+    The warm-up pass fills the result cache of every process that runs games, so the timed
+    rounds measure the request path rather than the simulations. The answer cache is off,
+    since it would skip the whole request path for the repeated prompts.
+    """
+    words = itertools.cycle(WORDS)
+    fake_client = AsyncOpenAI(api_key="test", base_url=fake_responses_server.base_url)
+    no_response_cache = ResponseCache(ttl=0)
+    with patch("api.main.client", fake_client), patch("ai_client.wrapper.RESPONSE_CACHE", no_response_cache), \
+            patch("ai_client.wrapper.LOCAL_ROUTER", routed), TestClient(app) as client:
+        def post(word: str):
+            response = client.post("/results", data={"user_input": PROMPTS[prompt](word)})
+            assert response.status_code == 201
+
+        for word in WORDS:
+            post(word)
+        benchmark.pedantic(post, setup=lambda: ((next(words),), {}), rounds=4 * len(WORDS), iterations=1)
+        client.portal.call(fake_client.close)
+    record_metrics(benchmark)
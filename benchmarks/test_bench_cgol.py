@@ -0,0 +1,68 @@
+import itertools
+
+import pytest
+
+from api.cgol import (
+    ENGINES,
+    Simulation,
+    convert_to_ascii_bitmask,
+    display_grid,
+    generate_initial_live_cells,
+    next_generation,
+    next_generation_packed,
+    run_game,
+    unpack_cells,
+)
+from benchmarks.metrics import record_metrics
+from benchmarks.corpus import WORDS
+
+# Boards to step: a seed, a busy early generation, and settled debris that still sheds gliders
+BOARDS = {"HELLO seed": ("HELLO", 0), "HELLO gen 60": ("HELLO", 60), "OpenAI gen 600": ("OpenAI", 600)}
+
+
+def board_after(word: str, generations: int) -> set[int]:
+    simulation = Simulation(word)
+    for _ in range(generations):
+        simulation.advance()
+    return simulation.state
+
+
+@pytest.mark.parametrize("board", BOARDS)
+def test_next_generation_packed(benchmark, board):
+    live_cells = board_after(*BOARDS[board])
+    benchmark(next_generation_packed, live_cells)
+    record_metrics(benchmark, generations=1, cells=len(live_cells))
+
+
+@pytest.mark.parametrize("board", BOARDS)
+def test_next_generation_tuples(benchmark, board):
+    live_cells = unpack_cells(board_after(*BOARDS[board]))
+    benchmark(next_generation, live_cells)
+    record_metrics(benchmark, generations=1, cells=len(live_cells))
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_run_game_corpus(benchmark, engine):
+    if engine == "numpy":
+        pytest.importorskip("numpy")
+    words = itertools.cycle(WORDS)
+    results = {word: run_game(word, engine=engine, use_cache=False) for word in WORDS}
+
+    # One round per word, so the round timings are the distribution of per-word latencies
+    benchmark.pedantic(
+        run_game,
+        setup=lambda: ((next(words),), {"engine": engine, "use_cache": False}),
+        rounds=len(WORDS),
+        iterations=1,
+    )
+    record_metrics(
+        benchmark,
+        generations=sum(result["generations"] for result in results.values()) / len(WORDS),
+        cells=sum(result["score"] for result in results.values()) / len(WORDS),
+    )
+
+
+def test_display_grid(benchmark):
+    live_cells = generate_initial_live_cells(convert_to_ascii_bitmask("HELLO"))
+    benchmark(display_grid, live_cells)
+    record_metrics(benchmark, cells=len(live_cells))
@@ -0,0 +1,24 @@
+import argparse
+import sys
+from api.batch import parse_words
+from api.cgol import ENGINES, TOPOLOGIES
+from api.lookup import KEY_SIZE, build_lookup_table
+from batch import open_stream
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Precompute run_game results for a word list into a lookup table.")
+    parser.add_argument("input", nargs="?", default="-", help="Word list or JSONL file, or - for stdin (default)")
+    parser.add_argument("-o", "--output", required=True, help="File to write the lookup table to")
+    parser.add_argument("--generations", type=int, default=1000, help="Maximum generations per game (default 1000)")
+    parser.add_argument("--engine", choices=ENGINES, default="set", help="Stepping engine (default set)")
+    parser.add_argument("--topology", choices=TOPOLOGIES, default="infinite", help="Shape of the plane (default infinite)")
+    args = parser.parse_args(argv)
+
+    with open_stream(args.input, "r", sys.stdin) as source:
+        count = build_lookup_table(parse_words(source), args.output, args.generations, args.engine, args.topology)
+    print(f"Wrote {count} results to {args.output}, skipping words longer than {KEY_SIZE} bytes", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
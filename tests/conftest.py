@@ -0,0 +1,31 @@
+import pytest
+from unittest.mock import patch
+from api.cgol import RESULT_CACHE
+from ai_client.wrapper import RESPONSE_CACHE
+
+
+@pytest.fixture(autouse=True)
+def clear_result_cache():
+    RESULT_CACHE.clear()
+    RESPONSE_CACHE.clear()
+    yield
+    RESULT_CACHE.clear()
+    RESPONSE_CACHE.clear()
+
+
+@pytest.fixture(autouse=True)
+def llm_only():
+    # Most tests drive the model's tool-calling loop with simple prompts, so the local router is
+    # off unless a test turns it on
+    with patch("ai_client.wrapper.LOCAL_ROUTER", False):
+        yield
+
+
+@pytest.fixture(scope="session")
+def fake_responses_server():
+    from tests.fake_openai import FakeResponsesServer
+
+    server = FakeResponsesServer()
+    server.start()
+    yield server
+    server.stop()
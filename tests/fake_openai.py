@@ -0,0 +1,128 @@
+"""Local fake of the OpenAI Responses API
+A small FastAPI app that answers POST /v1/responses the way the model does for this
+project, so the request path can be tested and benchmarked offline. The first call of a
+conversation asks for run_game on every quoted word in the user's input; once function
+outputs are sent back it replies with a text summary of them. Requests with stream set
+get the same reply as server-sent events.
+"""
+
+import itertools
+import json
+import re
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+fake_app = FastAPI()
+_ids = itertools.count()
+
+
+def response_body(output: list[dict]) -> dict:
+    return {
+        "id": f"resp_{next(_ids)}",
+        "object": "response",
+        "created_at": time.time(),
+        "model": "gpt-4o-mini",
+        "status": "completed",
+        "output": output,
+        "parallel_tool_calls": True,
+        "tool_choice": "auto",
+        "tools": [],
+    }
+
+
+def text_message(text: str) -> dict:
+    return {
+        "id": f"msg_{next(_ids)}",
+        "type": "message",
+        "role": "assistant",
+        "status": "completed",
+        "content": [{"type": "output_text", "text": text, "annotations": []}],
+    }
+
+
+def function_call(word: str) -> dict:
+    return {
+        "id": f"fc_{next(_ids)}",
+        "type": "function_call",
+        "name": "run_game",
+        "call_id": f"call_{word}",
+        "arguments": json.dumps({"word": word}),
+        "status": "completed",
+    }
+
+
+def reply(input_list: list[dict]) -> dict:
+    outputs = [item for item in input_list if item.get("type") == "function_call_output"]
+    if outputs:
+        lines = []
+        for item in outputs:
+            result = json.loads(item["output"])
+            word = item["call_id"].removeprefix("call_")
+            lines.append(f"{word}: **{result['generations']}** generations, score {result['score']}")
+        return response_body([text_message("\n".join(lines))])
+
+    user_input = next(item["content"] for item in input_list if item.get("role") == "user")
+    words = re.findall(r"['\"](\w+)['\"]", user_input)
+    if not words:
+        return response_body([text_message("Please provide a word.")])
+    return response_body([function_call(word) for word in words])
+
+
+def stream_events(response: dict):
+    """Yields the Responses streaming events for a reply: text deltas, then response.completed."""
+    sequence = itertools.count()
+    for item in response["output"]:
+        if item["type"] == "message":
+            text = item["content"][0]["text"]
+            for piece in re.findall(r"\S+\s*", text):
+                yield {
+                    "type": "response.output_text.delta",
+                    "item_id": item["id"],
+                    "output_index": 0,
+                    "content_index": 0,
+                    "delta": piece,
+                    "logprobs": [],
+                    "sequence_number": next(sequence),
+                }
+    yield {"type": "response.completed", "response": response, "sequence_number": next(sequence)}
+
+
+@fake_app.post("/v1/responses")
+async def create_response(request: Request):
+    body = await request.json()
+    response = reply(body["input"])
+    if not body.get("stream"):
+        return response
+
+    async def events():
+        for event in stream_events(response):
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+class FakeResponsesServer:
+    """Runs fake_app with uvicorn on a background thread."""
+
+    def __init__(self, port: int = 0):
+        config = uvicorn.Config(fake_app, host="127.0.0.1", port=port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        port = self.server.servers[0].sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/v1"
+
+    def start(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join()
@@ -1,10 +1,14 @@
+import json
 import pytest
 from fastapi.testclient import TestClient
-from api.main import app
-from unittest.mock import patch
+from openai import AsyncOpenAI
+from api.main import app, format_sse
+from api.cgol import run_game
+from ai_client.wrapper import ResponseTimeout
+from unittest.mock import patch, AsyncMock
 
 class TestRunCgolGame:
-    @patch("api.main.client_response")
+    @patch("api.main.async_client_response", new_callable=AsyncMock)
     def test_run_cgol_game(self, mock_client_response):
         client = TestClient(app)
 
@@ -15,10 +19,78 @@ class TestRunCgolGame:
         
         assert response.status_code == 201
         assert response.json() == {"server_response": expected_res}
-        mock_client_response.assert_called_once()
+        mock_client_response.assert_awaited_once()
 
     def test_run_cgol_game_empty(self):
         client = TestClient(app)
         response = client.post("/results", data={"user_input": ""})
         assert response.status_code == 200
-        assert response.json()["server_response"] == "Invalid user input"
\ No newline at end of file
+        assert response.json()["server_response"] == "Invalid user input"
+
+    @patch("api.main.async_client_response", new_callable=AsyncMock)
+    def test_run_cgol_game_timeout(self, mock_client_response):
+        client = TestClient(app)
+        mock_client_response.side_effect = ResponseTimeout()
+        response = client.post("/results", data={"user_input": "score every word in the dictionary"})
+        assert response.status_code == 504
+        assert "took too long" in response.json()["server_response"]
+
+
+class TestStreamCgolGame:
+    def test_stream_cgol_game(self, fake_responses_server):
+        fake_client = AsyncOpenAI(api_key="test", base_url=fake_responses_server.base_url)
+        with patch("api.main.client", fake_client):
+            client = TestClient(app)
+            response = client.post("/results/stream", data={"user_input": "score 'blunt'"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [message.split("\n") for message in response.text.strip().split("\n\n")]
+        names = [lines[0].removeprefix("event: ") for lines in events]
+        assert names[0] == "result"
+        assert json.loads(events[0][1].removeprefix("data: ")) == {"word": "blunt", "result": run_game("blunt")}
+        assert set(names[1:-1]) == {"token"}
+        assert names[-1] == "done"
+
+    @patch("api.main.stream_client_response")
+    def test_stream_cgol_game_error(self, mock_stream):
+        async def failing_stream(*args, **kwargs):
+            yield "result", {"word": "blunt", "result": {}}
+            raise ResponseTimeout()
+
+        mock_stream.side_effect = failing_stream
+        client = TestClient(app)
+        response = client.post("/results/stream", data={"user_input": "score 'blunt'"})
+        assert response.text.endswith(format_sse("error", "The request took too long to answer. Try asking about fewer words."))
+
+    def test_stream_cgol_game_empty(self):
+        client = TestClient(app)
+        response = client.post("/results/stream", data={"user_input": ""})
+        assert response.json()["server_response"] == "Invalid user input"
+
+
+class TestStreamGenerations:
+    def test_stream_generations(self):
+        client = TestClient(app)
+        response = client.get("/generations", params={"word": "monument"})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        result = run_game("monument")
+        assert lines[-1] == {"result": {**result, "displacement": list(result["displacement"])}}
+        assert [line["generation"] for line in lines[:-1]] == list(range(result["generations"] + 1))
+
+    def test_stream_generations_topology(self):
+        client = TestClient(app)
+        response = client.get("/generations", params={"word": "OpenAI", "generations": 300, "topology": "torus"})
+        assert json.loads(response.text.splitlines()[-1])["result"] == json.loads(
+            json.dumps(run_game("OpenAI", 300, topology="torus"))
+        )
+        response = client.get("/generations", params={"word": "OpenAI", "topology": "sphere"})
+        assert response.status_code == 400
+
+    def test_stream_generations_rejects_long_words(self):
+        client = TestClient(app)
+        response = client.get("/generations", params={"word": "a" * 61})
+        assert response.status_code == 422
@@ -0,0 +1,89 @@
+import json
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from api.batch import iter_batch_results, parse_words
+from api.cgol import run_game
+from api.main import app
+from batch import main
+
+
+@pytest.fixture
+def thread_game_executor():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        with patch("api.batch.get_game_executor", return_value=executor):
+            yield executor
+
+
+class TestParseWords:
+    def test_parse_words_plain_list(self):
+        assert list(parse_words(["monument\n", "  blunt \n", "\n"])) == ["monument", "blunt"]
+
+    def test_parse_words_jsonl(self):
+        lines = ['{"word": "monument", "id": 1}', '"blunt"', "HELLO"]
+        assert list(parse_words(lines)) == ["monument", "blunt", "HELLO"]
+
+    def test_parse_words_object_without_word(self):
+        with pytest.raises(ValueError):
+            list(parse_words(['{"title": "monument"}']))
+
+
+class TestIterBatchResults:
+    def test_results_keep_input_order(self, thread_game_executor):
+        words = ["HELLO", "A", "monument", "zq", "blunt"]
+        results = list(iter_batch_results(words, max_pending=3))
+        assert results == [(word, run_game(word)) for word in words]
+
+    def test_reads_words_only_as_needed(self, thread_game_executor):
+        read = []
+
+        def words():
+            for word in ["a", "b", "c", "d", "e", "f"]:
+                read.append(word)
+                yield word
+
+        results = iter_batch_results(words(), max_pending=2)
+        next(results)
+        assert read == ["a", "b"]
+        results.close()
+
+    def test_passes_generations_and_engine(self, thread_game_executor):
+        with patch("api.batch.run_game", return_value={}) as mock_run_game:
+            list(iter_batch_results(["blunt"], generations=10, engine="set"))
+        mock_run_game.assert_called_once_with("blunt", 10, "set", topology="infinite")
+
+    def test_numpy_engine_runs_chunks_together(self, thread_game_executor):
+        words = [f"word{i}" for i in range(5)]
+        with patch("api.batch.NUMPY_CHUNK_SIZE", 2), \
+                patch("api.cgol_numpy.run_games", side_effect=lambda chunk, generations, topology: list(chunk)) as mock_run_games:
+            results = list(iter_batch_results(words, generations=10, engine="numpy"))
+        assert results == [(word, word) for word in words]
+        assert [call.args[0] for call in mock_run_games.call_args_list] == [words[0:2], words[2:4], words[4:]]
+
+
+class TestBatchEndpoint:
+    def test_batch_streams_results(self, thread_game_executor):
+        client = TestClient(app)
+        response = client.post("/batch", content="monument\n{\"word\": \"blunt\"}\n", params={"generations": 50})
+        assert response.status_code == 200
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["word"] for line in lines] == ["monument", "blunt"]
+        assert lines[1]["score"] == run_game("blunt", 50)["score"]
+
+    def test_batch_rejects_unknown_engine(self):
+        client = TestClient(app)
+        response = client.post("/batch", content="monument\n", params={"engine": "bitset"})
+        assert response.status_code == 400
+
+
+class TestBatchCli:
+    def test_batch_cli_writes_jsonl(self, tmp_path, thread_game_executor):
+        source = tmp_path / "words.txt"
+        source.write_text("monument\nblunt\n")
+        target = tmp_path / "results.jsonl"
+
+        main([str(source), "-o", str(target), "--generations", "100"])
+
+        lines = [json.loads(line) for line in target.read_text().splitlines()]
+        assert lines == [{"word": word, **json.loads(json.dumps(run_game(word, 100)))} for word in ["monument", "blunt"]]
@@ -0,0 +1,68 @@
+import pytest
+from unittest.mock import patch
+from api.cache import ResultCache, decode_result
+from api.cgol import run_game, Simulation, RESULT_CACHE
+
+RESULT = {"generations": 4, "score": 20, "period": 4, "displacement": (1, 1)}
+
+
+class TestResultCache:
+    def test_get_miss_then_hit(self):
+        cache = ResultCache()
+        assert cache.get("blunt", 1000, "set") is None
+        cache.put("blunt", 1000, "set", RESULT)
+        assert cache.get("blunt", 1000, "set") == RESULT
+        assert cache.stats() == {"hits": 1, "misses": 1, "disk_hits": 0, "size": 1}
+
+    def test_key_includes_generations_and_engine(self):
+        cache = ResultCache()
+        cache.put("blunt", 1000, "set", RESULT)
+        assert cache.get("blunt", 10, "set") is None
+        assert cache.get("blunt", 1000, "numpy") is None
+
+    def test_evicts_least_recently_used(self):
+        cache = ResultCache(maxsize=2)
+        cache.put("a", 1000, "set", RESULT)
+        cache.put("b", 1000, "set", RESULT)
+        cache.get("a", 1000, "set")
+        cache.put("c", 1000, "set", RESULT)
+        assert cache.get("b", 1000, "set") is None
+        assert cache.get("a", 1000, "set") == RESULT
+        assert cache.get("c", 1000, "set") == RESULT
+
+    def test_returns_copies(self):
+        cache = ResultCache()
+        cache.put("blunt", 1000, "set", RESULT)
+        cache.get("blunt", 1000, "set")["score"] = 0
+        assert cache.get("blunt", 1000, "set") == RESULT
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        path = str(tmp_path / "results.sqlite")
+        ResultCache(path=path).put("blunt", 1000, "set", RESULT)
+
+        cache = ResultCache(path=path)
+        assert cache.get("blunt", 1000, "set") == RESULT
+        assert cache.stats()["disk_hits"] == 1
+        cache.get("blunt", 1000, "set")
+        assert cache.stats()["disk_hits"] == 1
+
+    def test_decode_result_without_displacement(self):
+        assert decode_result('{"generations": 1, "displacement": null}') == {"generations": 1, "displacement": None}
+
+
+class TestRunGameCache:
+    def test_run_game_uses_cache(self):
+        first = run_game("monument")
+        with patch.object(Simulation, "run") as mock_run:
+            assert run_game("monument") == first
+            mock_run.assert_not_called()
+        assert RESULT_CACHE.stats()["hits"] == 1
+
+    def test_run_game_without_cache(self):
+        run_game("monument", use_cache=False)
+        assert RESULT_CACHE.stats() == {"hits": 0, "misses": 0, "disk_hits": 0, "size": 0}
+
+    def test_run_game_rejects_unknown_engine_before_cache(self):
+        with pytest.raises(ValueError):
+            run_game("monument", engine="bitset")
+        assert RESULT_CACHE.stats()["misses"] == 0
@@ -1,4 +1,6 @@
+import time
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 from api.cgol import (
     convert_to_ascii_bitmask,
@@ -6,14 +8,22 @@ from api.cgol import (
     come_to_life,
     continue_living,
     next_generation,
+    next_generation_packed,
     display_grid,
-    check_end_conditons,
+    Simulation,
+    SimulationTimeout,
+    iter_generations,
     run_game,
     ALIVE,
     DEAD,
     ROWS,
     COLUMNS,
-    LIVE_CELL_HISTORY,
+    cell_hash,
+    get_simulation_class,
+    pack_cell,
+    pack_cells,
+    unpack_cell,
+    unpack_cells,
 )
 
 class TestConvertToAsciiBitmask:
@@ -94,7 +104,41 @@ class TestNextGeneration:
         live_cells = set()
         next_gen = next_generation(live_cells)
         assert next_gen == set()
+
+    def test_next_generation_bounded_clips_at_edges(self):
+        # Horizontal blinker on the top row loses the cell it would grow above the grid
+        live_cells = {(0, 5), (0, 6), (0, 7)}
+        assert next_generation(live_cells, "bounded") == {(0, 6), (1, 6)}
+
+    def test_next_generation_torus_wraps_edges(self):
+        live_cells = {(0, 5), (0, 6), (0, 7)}
+        assert next_generation(live_cells, "torus") == {(ROWS - 1, 6), (0, 6), (1, 6)}
+        corner = {(0, 0), (0, COLUMNS - 1), (ROWS - 1, 0)}
+        assert next_generation(corner, "torus") == corner | {(ROWS - 1, COLUMNS - 1)}
+
+    def test_next_generation_unknown_topology(self):
+        with pytest.raises(ValueError):
+            next_generation({(1, 1)}, "sphere")
          
+class TestPackedCells:
+    def test_pack_cell_round_trip(self):
+        cells = {(0, 0), (3, -4), (-4, 3), (-70000, 2 ** 30), (59, 39)}
+        assert {unpack_cell(pack_cell(cell)) for cell in cells} == cells
+        assert unpack_cells(pack_cells(cells)) == cells
+
+    def test_packed_cells_sort_like_tuples(self):
+        cells = [(-1, 5), (0, -3), (0, 2), (2, -8), (2, 0)]
+        assert sorted(map(pack_cell, cells)) == list(map(pack_cell, sorted(cells)))
+
+    def test_next_generation_packed_matches_tuples(self):
+        live_cells = generate_initial_live_cells(convert_to_ascii_bitmask("HELLO"))
+        packed = pack_cells(live_cells)
+        for _ in range(20):
+            live_cells = next_generation(live_cells)
+            packed = next_generation_packed(packed)
+            assert unpack_cells(packed) == live_cells
+
+
 class TestContinueLiving:
     def test_continue_living_survives_with_2_or_3_neighbors(self):
         # Cell (1,1) has 2 neighbors, (2,2) has 3 neighbors
@@ -168,23 +212,74 @@ class TestDisplayGrid:
         assert grid == f"{ALIVE}{ALIVE}{DEAD}"
 
 class TestCheckEndConditions:
-    def test_check_end_conditons_no_history(self):
-        LIVE_CELL_HISTORY.clear()
-        assert not check_end_conditons({(1, 1)})
-
-
-    def test_check_end_conditons_single_generation_same_next_gen(self):
-        LIVE_CELL_HISTORY.clear()
-        gen = {(1, 1)}
-        LIVE_CELL_HISTORY.append(gen)
-        assert check_end_conditons(gen)
-
-    def test_check_end_conditons_single_generation_diff_next_gen(self):
-        LIVE_CELL_HISTORY.clear()
-        gen = {(1, 1), (1, 2), (2, 1)}
-        LIVE_CELL_HISTORY.append(gen)
-        gen = next_generation(gen)
-        assert not check_end_conditons(gen)
+    def test_check_end_conditions_no_history(self):
+        simulation = Simulation("A")
+        simulation.state = pack_cells({(1, 1)})
+        assert not simulation.check_end_conditions()
+
+    def test_check_end_conditions_empty_generation(self):
+        simulation = Simulation("A")
+        simulation.state = set()
+        assert simulation.check_end_conditions()
+
+    def test_check_end_conditions_single_generation_same_next_gen(self):
+        simulation = Simulation("A")
+        simulation.state = pack_cells({(1, 1)})
+        simulation.check_end_conditions()
+        assert simulation.check_end_conditions()
+
+    def test_check_end_conditions_single_generation_diff_next_gen(self):
+        simulation = Simulation("A")
+        simulation.state = pack_cells({(1, 1), (1, 2), (2, 1)})
+        simulation.check_end_conditions()
+        simulation.advance()
+        assert not simulation.check_end_conditions()
+
+    def test_check_end_conditions_detects_long_periods(self):
+        simulation = Simulation("", generations=200)
+        simulation.state = pack_cells({(0, col) for col in range(10)})  # becomes a pentadecathlon
+        result = simulation.run()
+        assert result["period"] == 15
+        assert result["displacement"] == (0, 0)
+
+    def test_check_end_conditions_detects_spaceships(self):
+        simulation = Simulation("")
+        simulation.state = pack_cells({(0, 1), (1, 2), (2, 0), (2, 1), (2, 2)})  # glider
+        result = simulation.run()
+        assert result == {"generations": 4, "score": 20, "period": 4, "displacement": (1, 1)}
+
+    def test_check_end_conditions_still_life(self):
+        simulation = Simulation("")
+        simulation.state = pack_cells({(1, 1), (1, 2), (2, 1), (2, 2)})
+        result = simulation.run()
+        assert result == {"generations": 1, "score": 4, "period": 1, "displacement": (0, 0)}
+
+    def test_cell_hash_is_stable(self):
+        assert cell_hash(pack_cell((3, -4))) == cell_hash(pack_cell((3, -4)))
+        assert cell_hash(pack_cell((3, -4))) != cell_hash(pack_cell((-4, 3)))
+
+    def test_fingerprint_is_translation_invariant(self):
+        first, second = Simulation(""), Simulation("")
+        cells = {(0, 0), (0, 1), (5, 3)}
+        first.state = pack_cells(cells)
+        second.state = pack_cells({(row - 7, col + 11) for row, col in cells})
+        assert first.fingerprint()[0] == second.fingerprint()[0]
+        assert second.fingerprint()[1] == (-7, 11)
+
+    def test_fingerprint_rolls_with_advance(self):
+        rolled = Simulation("HELLO")
+        for _ in range(30):
+            rolled.fingerprint()
+            rolled.advance()
+        rebuilt = Simulation("")
+        rebuilt.state = set(rolled.state)
+        assert rolled.fingerprint() == rebuilt.fingerprint()
+
+    def test_simulations_do_not_share_history(self):
+        first = Simulation("A")
+        first.check_end_conditions()
+        second = Simulation("A")
+        assert not second.check_end_conditions()
 
 class TestRunGame:
     def test_run_game_returns_proper_output(self):
@@ -195,7 +290,7 @@ class TestRunGame:
         assert isinstance(result["score"], int)
 
     def test_run_game_no_end_conditions(self):
-        with patch("api.cgol.check_end_conditons", return_value=False):
+        with patch.object(Simulation, "check_end_conditions", return_value=False):
             result = run_game("A", generations=10)
             assert result["generations"] == 10
             assert result["score"] == len(generate_initial_live_cells(convert_to_ascii_bitmask("A"))) # A dies off in the next gen, bin=01000001
@@ -205,8 +300,70 @@ class TestRunGame:
         assert result["generations"] == 0
         assert result["score"] == 0
 
+    def test_run_game_fixed_topologies_keep_glider_on_grid(self):
+        # A glider heading for the corner is clipped or wrapped instead of leaving the grid
+        glider = {(ROWS - 5, COLUMNS - 4), (ROWS - 4, COLUMNS - 3), (ROWS - 3, COLUMNS - 5),
+                  (ROWS - 3, COLUMNS - 4), (ROWS - 3, COLUMNS - 3)}
+        for topology in ("bounded", "torus"):
+            simulation = Simulation("", 1000, topology=topology)
+            simulation.state = pack_cells(glider)
+            for _ in simulation.steps():
+                assert all(0 <= row < ROWS and 0 <= col < COLUMNS for row, col in unpack_cells(simulation.state))
+
+    def test_run_game_caches_each_topology(self):
+        infinite = run_game("OpenAI", 300)
+        bounded = run_game("OpenAI", 300, topology="bounded")
+        assert bounded != infinite
+        assert run_game("OpenAI", 300, topology="bounded") == bounded
+        assert run_game("OpenAI", 300) == infinite
+
+    def test_run_game_unknown_topology(self):
+        with pytest.raises(ValueError):
+            run_game("A", topology="sphere")
+        with pytest.raises(ValueError):
+            get_simulation_class("hashlife", "torus")
+
+    def test_run_game_is_repeatable(self):
+        expected = {"generations": 1, "score": 2, "period": None, "displacement": None}
+        assert run_game("A") == run_game("A") == expected
+
+    def test_run_game_in_parallel_threads(self):
+        words = ["monument", "blunt", "HELLO", "A", "zq", "abcdefgh"] * 4
+        expected = [run_game(word) for word in words]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            assert list(executor.map(run_game, words)) == expected
+
+    def test_run_game_stops_at_deadline(self):
+        with pytest.raises(SimulationTimeout):
+            run_game("HELLO", deadline=time.time() - 1)
+        assert run_game("HELLO", deadline=time.time() + 60)["generations"] == 177
+
     def test_run_game_complex_word(self):
-        with patch("api.cgol.check_end_conditons", return_value=False):
+        with patch.object(Simulation, "check_end_conditions", return_value=False):
             result = run_game("HELLO", generations=10)
             assert result["generations"] == 10
-            assert result["score"] > 0  
\ No newline at end of file
+            assert result["score"] > 0
+
+
+class TestIterGenerations:
+    def test_iter_generations_starts_with_seed(self):
+        first = next(iter_generations("A"))
+        seed = generate_initial_live_cells(convert_to_ascii_bitmask("A"))
+        assert first == {"generation": 0, "born": sorted(seed), "died": []}
+
+    def test_iter_generations_deltas_rebuild_each_generation(self):
+        board = set()
+        simulation = Simulation("HELLO")
+        expected = Simulation("HELLO")
+        for delta in simulation.iter_generations():
+            if delta["generation"] > 0:
+                expected.advance()
+            board |= set(delta["born"])
+            board -= set(delta["died"])
+            assert board == unpack_cells(expected.state)
+
+    def test_iter_generations_matches_run_game(self):
+        simulation = Simulation("monument")
+        deltas = list(simulation.iter_generations())
+        assert simulation.result() == run_game("monument")
+        assert deltas[-1]["generation"] == run_game("monument")["generations"]
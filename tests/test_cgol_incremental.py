@@ -0,0 +1,65 @@
+import random
+import string
+import pytest
+
+from api.cgol import Simulation, pack_cells, run_game, unpack_cells
+from api.cgol_incremental import IncrementalSimulation
+
+
+def seed_words(count: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        "".join(rng.choice(string.ascii_letters + string.digits) for _ in range(rng.randint(1, 8)))
+        for _ in range(count)
+    ]
+
+
+BLOCK_FIELD = {(row + dr, col + dc) for row in range(0, 40, 4) for col in range(0, 40, 4) for dr in (0, 1) for dc in (0, 1)}
+# Glider heading up and to the left, away from the field
+GLIDER = {(-10, -11), (-11, -12), (-12, -10), (-12, -11), (-12, -12)}
+
+
+class TestIncrementalSimulation:
+    @pytest.mark.parametrize("topology", ["infinite", "bounded", "torus"])
+    def test_parity_with_set_engine(self, topology):
+        for word in ["HELLO", "monument", "OpenAI", ""] + seed_words(20):
+            expected = run_game(word, topology=topology)
+            assert run_game(word, engine="incremental", topology=topology) == expected, word
+
+    def test_generations_match_set_engine(self):
+        incremental, simulation = IncrementalSimulation("OpenAI"), Simulation("OpenAI")
+        for _ in range(300):
+            incremental.advance()
+            simulation.advance()
+            assert incremental.state == simulation.state
+            assert (incremental.born, incremental.died) == (simulation.born, simulation.died)
+
+    def test_only_cells_near_changes_are_evaluated(self):
+        simulation = IncrementalSimulation("", 100)
+        simulation.state = pack_cells(BLOCK_FIELD | GLIDER)
+        simulation.advance()
+        simulation.advance()
+        assert len(simulation._candidates()) < 9 * len(simulation.born | simulation.died) + 1
+        assert len(simulation._candidates()) < 100 < len(simulation.state)
+
+    def test_score_from_births_and_deaths(self):
+        simulation = IncrementalSimulation("", 400)
+        simulation.state = pack_cells(BLOCK_FIELD | GLIDER)
+        result = simulation.run()
+        assert result == {"generations": 400, "score": 400 * (len(BLOCK_FIELD) + 5), "period": None, "displacement": None}
+        assert simulation.population() == len(simulation.state)
+
+    def test_neighbour_counts_forget_cells_left_behind(self):
+        simulation = IncrementalSimulation("", 400)
+        simulation.state = pack_cells(GLIDER)
+        for _ in range(400):
+            simulation.advance()
+        assert len(simulation._neighbour_count) <= 9 * len(simulation.state)
+
+    def test_replaced_state_is_recounted(self):
+        simulation = IncrementalSimulation("HELLO")
+        simulation.advance()
+        simulation.state = pack_cells({(1, 1), (1, 2), (1, 3)})
+        simulation.advance()
+        assert unpack_cells(simulation.state) == {(0, 2), (1, 2), (2, 2)}
+        assert simulation.population() == 3
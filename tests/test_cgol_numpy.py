@@ -0,0 +1,154 @@
+import random
+import string
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from api.cgol import COLUMNS, ROWS, get_simulation_class, run_game, next_generation
+from api.cgol_numpy import (
+    cells_to_board,
+    board_to_cells,
+    crop_board,
+    next_generation_board,
+    NumpySimulation,
+    reframe_boards,
+    run_games,
+    step_boards,
+)
+from api.cgol import RESULT_CACHE
+
+
+def seed_words(count: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        "".join(rng.choice(string.ascii_letters + string.digits) for _ in range(rng.randint(1, 8)))
+        for _ in range(count)
+    ]
+
+
+class TestBoardConversion:
+    def test_cells_to_board_round_trip(self):
+        cells = {(3, 4), (5, 7), (-2, 0)}
+        board, origin = cells_to_board(cells)
+        assert origin == (-2, 0)
+        assert board.shape == (8, 8)
+        assert board_to_cells(board, origin) == cells
+
+    def test_cells_to_board_empty(self):
+        board, origin = cells_to_board(set())
+        assert board.size == 0
+        assert board_to_cells(board, origin) == set()
+
+    def test_crop_board(self):
+        board = np.zeros((5, 5), dtype=np.uint8)
+        board[2, 3] = 1
+        cropped, origin = crop_board(board, (10, 10))
+        assert cropped.shape == (1, 1)
+        assert origin == (12, 13)
+
+
+class TestNextGenerationBoard:
+    def test_blinker(self):
+        board, origin = cells_to_board({(1, 2), (2, 2), (3, 2)})
+        board, origin = next_generation_board(board, origin)
+        assert board_to_cells(board, origin) == {(2, 1), (2, 2), (2, 3)}
+
+    def test_matches_set_engine(self):
+        cells = {(0, 1), (1, 2), (2, 0), (2, 1), (2, 2)}  # glider
+        board, origin = cells_to_board(cells)
+        for _ in range(20):
+            cells = next_generation(cells)
+            board, origin = next_generation_board(board, origin)
+            assert board_to_cells(board, origin) == cells
+
+
+class TestNumpySimulation:
+    def test_run_game_selects_numpy_engine(self):
+        assert run_game("monument", engine="numpy") == run_game("monument")
+
+    def test_run_game_unknown_engine(self):
+        with pytest.raises(ValueError):
+            run_game("monument", engine="bitset")
+
+    def test_numpy_simulation_empty_input(self):
+        expected = {"generations": 0, "score": 0, "period": None, "displacement": None}
+        assert NumpySimulation("", generations=10).run() == expected
+
+    def test_numpy_simulation_detects_spaceships(self):
+        simulation = NumpySimulation("")
+        simulation.state = cells_to_board({(0, 1), (1, 2), (2, 0), (2, 1), (2, 2)})
+        result = simulation.run()
+        assert result == {"generations": 4, "score": 20, "period": 4, "displacement": (1, 1)}
+
+    def test_parity_with_set_engine_short_runs(self):
+        for word in seed_words(2000):
+            assert run_game(word, 50, engine="numpy") == run_game(word, 50), word
+
+    def test_parity_with_set_engine_full_runs(self):
+        for word in seed_words(40, seed=1):
+            assert run_game(word, engine="numpy") == run_game(word), word
+
+
+    @pytest.mark.parametrize("topology", ["bounded", "torus"])
+    def test_parity_with_set_engine_fixed_topologies(self, topology):
+        for word in seed_words(40, seed=3):
+            assert run_game(word, engine="numpy", topology=topology) == run_game(word, topology=topology), word
+
+    def test_fixed_board_is_stepped_in_place(self):
+        simulation = get_simulation_class("numpy", "torus")("OpenAI", 100, topology="torus")
+        board = simulation.state[0]
+        simulation.run()
+        assert simulation.state[0] is board
+        assert board.shape == (ROWS, COLUMNS)
+
+
+class TestRunGames:
+    def test_step_boards_matches_set_engine(self):
+        glider = {(2, 3), (3, 4), (4, 2), (4, 3), (4, 4)}
+        blinker = {(5, 5), (5, 6), (5, 7)}
+        boards = np.zeros((2, 12, 12), dtype=np.uint8)
+        for k, cells in enumerate([glider, blinker]):
+            for row, col in cells:
+                boards[k, row, col] = 1
+        stepped = step_boards(boards)
+        assert board_to_cells(stepped[0], (0, 0)) == next_generation(glider)
+        assert board_to_cells(stepped[1], (0, 0)) == next_generation(blinker)
+
+    def test_step_boards_torus_wraps_edges(self):
+        boards = np.zeros((1, 10, 12), dtype=np.uint8)
+        boards[0, 0, 5:8] = 1
+        assert board_to_cells(step_boards(boards, "torus")[0], (0, 0)) == {(9, 6), (0, 6), (1, 6)}
+        assert board_to_cells(step_boards(boards, "bounded")[0], (0, 0)) == {(0, 6), (1, 6)}
+
+    def test_reframe_boards_keeps_cells(self):
+        boards = np.zeros((2, 10, 10), dtype=np.uint8)
+        boards[0, 0, 4] = 1
+        boards[1, 9, 9] = 1
+        reframed, origin = reframe_boards(boards, (100, 200))
+        assert board_to_cells(reframed[0], origin) == {(100, 204)}
+        assert board_to_cells(reframed[1], origin) == {(109, 209)}
+        assert reframed[:, 0].sum() == reframed[:, -1].sum() == 0
+
+    def test_run_games_empty(self):
+        assert run_games([]) == []
+        assert run_games([""]) == [{"generations": 0, "score": 0, "period": None, "displacement": None}]
+
+    def test_run_games_parity_with_run_game(self):
+        words = seed_words(300, seed=2)
+        assert run_games(words, generations=200) == [run_game(word, 200) for word in words]
+
+    def test_run_games_parity_full_runs(self):
+        # Includes words whose debris throws off gliders, which are finished on their own
+        words = seed_words(40, seed=1)
+        assert run_games(words) == [run_game(word) for word in words]
+
+    @pytest.mark.parametrize("topology", ["bounded", "torus"])
+    def test_run_games_parity_fixed_topologies(self, topology):
+        words = seed_words(100, seed=4)
+        assert run_games(words, topology=topology) == [run_game(word, topology=topology) for word in words]
+
+    def test_run_games_uses_cache(self):
+        run_games(["monument", "blunt"])
+        assert RESULT_CACHE.stats()["misses"] == 2
+        assert run_games(["blunt", "monument"]) == [run_game("blunt"), run_game("monument")]
+        assert RESULT_CACHE.stats()["hits"] == 2
@@ -1,7 +1,30 @@
+import asyncio
 import json
+import time
 import pytest
-from unittest.mock import patch, MagicMock, Mock
-from ai_client.wrapper import client_response
+from unittest.mock import patch, AsyncMock, MagicMock, Mock
+from openai import AsyncOpenAI
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from ai_client.wrapper import async_client_response, stream_client_response, client_response, run_game_calls, ResponseTimeout
+from api.cgol import SimulationTimeout
+from api.cgol import run_game
+
+
+def make_function_call(word: str, call_id: str) -> MagicMock:
+    function_call = MagicMock()
+    function_call.type = "function_call"
+    function_call.name = "run_game"
+    function_call.arguments = json.dumps({"word": word})
+    function_call.call_id = call_id
+    return function_call
+
+
+@pytest.fixture(autouse=True)
+def thread_game_executor():
+    # Mocked run_game can't be pickled into the process pool, so run games on threads instead
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        with patch("ai_client.wrapper.get_game_executor", return_value=executor):
+            yield executor
 
 
 @patch("ai_client.wrapper.run_game")
@@ -30,12 +53,12 @@ class TestClientResponse:
         mock_client = MagicMock()
         # Simulate OpenAI response with no function call
         mock_client.responses.create.side_effect = [
-            MagicMock(output=[]),
-            MagicMock(output_text="No function call")
+            MagicMock(output=[], output_text="No function call"),
         ]
         result = client_response(mock_client, "no call")
         assert "No function call" in result
         mock_run_game.assert_not_called()
+        assert mock_client.responses.create.call_count == 1
 
     def test_client_response_handles_multiple_function_calls(self, mock_run_game: Mock):
         mock_run_game.side_effect = [
@@ -74,9 +97,170 @@ class TestClientResponse:
         mock_client = MagicMock()
         # Simulate OpenAI response with no function call
         mock_client.responses.create.side_effect = [
-            MagicMock(output=[]),
-            MagicMock(output_text="Please provide a specific word or query to proceed with the request.")
+            MagicMock(output=[], output_text="Please provide a specific word or query to proceed with the request."),
         ]
         result = client_response(mock_client, "")
         assert result == "Please provide a specific word or query to proceed with the request."
         mock_run_game.assert_not_called()
+
+    def test_client_response_keeps_call_order(self, mock_run_game):
+        mock_run_game.side_effect = lambda word: {"generations": len(word), "score": 0}
+        calls = [make_function_call(word, f"{word}123") for word in ["a", "bb", "ccc", "dddd"]]
+        mock_client = MagicMock()
+        mock_client.responses.create.side_effect = [MagicMock(output=calls), MagicMock(output_text="done")]
+
+        client_response(mock_client, "score a, bb, ccc and dddd")
+
+        second_input = mock_client.responses.create.call_args_list[1].kwargs["input"]
+        outputs = [item for item in second_input if isinstance(item, dict) and item.get("type") == "function_call_output"]
+        assert [output["call_id"] for output in outputs] == ["a123", "bb123", "ccc123", "dddd123"]
+        assert [json.loads(output["output"])["generations"] for output in outputs] == [1, 2, 3, 4]
+
+
+    def test_client_response_dispatches_follow_up_calls(self, mock_run_game):
+        mock_run_game.return_value = {"generations": 5, "score": 10}
+        mock_client = MagicMock()
+        mock_client.responses.create.side_effect = [
+            MagicMock(output=[make_function_call("foo", "foo123")]),
+            MagicMock(output=[make_function_call("bar", "bar123")]),
+            MagicMock(output=[], output_text="foo and bar"),
+        ]
+
+        assert client_response(mock_client, "score foo, then a word like it") == "foo and bar"
+        assert [call.args for call in mock_run_game.call_args_list] == [("foo",), ("bar",)]
+        assert mock_client.responses.create.call_count == 3
+
+    def test_client_response_stops_calling_tools_after_max_rounds(self, mock_run_game):
+        mock_run_game.return_value = {"generations": 5, "score": 10}
+        mock_client = MagicMock()
+        mock_client.responses.create.side_effect = [
+            MagicMock(output=[make_function_call("foo", "foo123")]),
+            MagicMock(output=[make_function_call("bar", "bar123")]),
+            MagicMock(output=[], output_text="only foo and bar"),
+        ]
+
+        assert client_response(mock_client, "keep going", max_rounds=2) == "only foo and bar"
+        calls = mock_client.responses.create.call_args_list
+        assert "tool_choice" not in calls[1].kwargs
+        assert calls[2].kwargs["tool_choice"] == "none"
+
+    def test_client_response_passes_remaining_time_to_model(self, mock_run_game):
+        mock_client = MagicMock()
+        mock_client.responses.create.side_effect = [MagicMock(output=[], output_text="hi")]
+
+        client_response(mock_client, "hi", timeout=30)
+
+        assert 0 < mock_client.responses.create.call_args.kwargs["timeout"] <= 30
+
+    def test_client_response_times_out_on_slow_games(self, mock_run_game):
+        mock_run_game.side_effect = SimulationTimeout()
+        mock_client = MagicMock()
+        mock_client.responses.create.side_effect = [MagicMock(output=[make_function_call("foo", "foo123")])]
+
+        with pytest.raises(ResponseTimeout):
+            client_response(mock_client, "score foo", timeout=30)
+        assert "deadline" in mock_run_game.call_args.kwargs
+
+    def test_client_response_times_out_before_next_model_call(self, mock_run_game):
+        mock_run_game.side_effect = lambda word, deadline: time.sleep(0.2) or {"generations": 1, "score": 1}
+        mock_client = MagicMock()
+        mock_client.responses.create.side_effect = [MagicMock(output=[make_function_call("foo", "foo123")])]
+
+        with pytest.raises(ResponseTimeout):
+            client_response(mock_client, "score foo", timeout=0.1)
+        assert mock_client.responses.create.call_count == 1
+
+
+class TestRunGameCalls:
+    def test_run_game_calls_in_process_pool(self):
+        words = ["monument", "blunt", "HELLO"]
+        calls = [make_function_call(word, word) for word in words]
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            with patch("ai_client.wrapper.get_game_executor", return_value=executor):
+                results = run_game_calls(calls)
+        assert results == [run_game(word) for word in words]
+
+    def test_run_game_calls_single_call_runs_inline(self):
+        with patch("ai_client.wrapper.get_game_executor") as mock_executor:
+            assert run_game_calls([make_function_call("blunt", "blunt")]) == [run_game("blunt")]
+            mock_executor.assert_not_called()
+
+    def test_run_game_calls_cancels_games_after_deadline(self):
+        started = []
+
+        def slow_game(word, deadline):
+            started.append(word)
+            time.sleep(0.3)
+            return {"generations": 1, "score": 1}
+
+        calls = [make_function_call(word, word) for word in "abcd"]
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            with patch("ai_client.wrapper.get_game_executor", return_value=executor), \
+                    patch("ai_client.wrapper.run_game", side_effect=slow_game):
+                with pytest.raises(ResponseTimeout):
+                    run_game_calls(calls, deadline=time.time() + 0.1)
+        assert started == ["a"]
+
+
+class TestAsyncClientResponse:
+    @patch("ai_client.wrapper.run_game")
+    def test_async_client_response_calls_run_game_with_word(self, mock_run_game):
+        mock_run_game.return_value = {"generations": 5, "score": 10}
+        mock_client = MagicMock()
+        mock_client.responses.create = AsyncMock(side_effect=[
+            MagicMock(output=[make_function_call("blunt", "abc123")]),
+            MagicMock(output_text="**blunt** has 5 generations"),
+        ])
+
+        result = asyncio.run(async_client_response(mock_client, "give me data on the word blunt"))
+
+        assert result == "blunt has 5 generations"
+        mock_run_game.assert_called_once_with("blunt")
+        assert mock_client.responses.create.await_count == 2
+
+    def test_async_client_response_against_fake_server(self, fake_responses_server):
+        async def ask_all(prompts):
+            client = AsyncOpenAI(api_key="test", base_url=fake_responses_server.base_url)
+            async with client:
+                return await asyncio.gather(*(async_client_response(client, prompt) for prompt in prompts))
+
+        prompts = [f"score 'monument' and 'blunt' ({i})" for i in range(20)]
+        results = asyncio.run(ask_all(prompts))
+
+        monument, blunt = run_game("monument"), run_game("blunt")
+        expected = (
+            f"monument: {monument['generations']} generations, score {monument['score']}\n"
+            f"blunt: {blunt['generations']} generations, score {blunt['score']}"
+        )
+        assert results == [expected] * 20
+
+
+class TestStreamClientResponse:
+    def collect(self, server, prompt, **kwargs):
+        async def gather_events():
+            async with AsyncOpenAI(api_key="test", base_url=server.base_url) as client:
+                return [event async for event in stream_client_response(client, prompt, **kwargs)]
+        return asyncio.run(gather_events())
+
+    def test_stream_client_response_against_fake_server(self, fake_responses_server):
+        events = self.collect(fake_responses_server, "score 'monument' and 'blunt'")
+
+        results = [data for event, data in events if event == "result"]
+        assert sorted(result["word"] for result in results) == ["blunt", "monument"]
+        assert all(result["result"] == run_game(result["word"]) for result in results)
+
+        tokens = [data for event, data in events if event == "token"]
+        assert len(tokens) > 1
+        assert events[-1][0] == "token"
+        monument = run_game("monument")
+        assert "".join(tokens).startswith(f"monument: {monument['generations']} generations")
+
+    def test_stream_client_response_without_tool_calls(self, fake_responses_server):
+        events = self.collect(fake_responses_server, "no words here")
+        assert events == [("token", "Please "), ("token", "provide "), ("token", "a "), ("token", "word.")]
+
+    @patch("ai_client.wrapper.run_game")
+    def test_stream_client_response_times_out_on_slow_games(self, mock_run_game, fake_responses_server):
+        mock_run_game.side_effect = SimulationTimeout()
+        with pytest.raises(ResponseTimeout):
+            self.collect(fake_responses_server, "score 'monument'", timeout=30)
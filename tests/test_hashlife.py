@@ -0,0 +1,86 @@
+import random
+import string
+import time
+import pytest
+
+from api.cgol import run_game, next_generation, Simulation, SimulationTimeout
+from api.hashlife import HashLife, HashLifeSimulation, normalize
+
+
+def seed_words(count: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        "".join(rng.choice(string.ascii_letters + string.digits) for _ in range(rng.randint(1, 6)))
+        for _ in range(count)
+    ]
+
+
+GLIDER = {(0, 1), (1, 2), (2, 0), (2, 1), (2, 2)}
+
+
+class TestHashLife:
+    def test_from_cells_round_trip(self):
+        life = HashLife()
+        cells = {(-3, 5), (0, 0), (12, -7), (2, 2)}
+        assert life.to_cells(*life.from_cells(cells)) == cells
+
+    def test_nodes_are_canonical(self):
+        life = HashLife()
+        first, _ = life.from_cells(GLIDER)
+        second, _ = life.from_cells(GLIDER)
+        assert first is second
+
+    @pytest.mark.parametrize("generations", [1, 2, 3, 5, 8, 37])
+    def test_advance_matches_next_generation(self, generations):
+        life = HashLife()
+        cells = GLIDER | {(10, 10), (10, 11), (10, 12)}
+        node, origin, total = life.advance(*life.from_cells(cells), generations)
+
+        expected_total = 0
+        for _ in range(generations):
+            cells = next_generation(cells)
+            expected_total += len(cells)
+        assert life.to_cells(node, origin) == cells
+        assert total == expected_total
+
+    def test_advance_after_garbage_collection(self):
+        life = HashLife(max_nodes=50)
+        node, origin, _ = life.advance(*life.from_cells(GLIDER), 400)
+        assert normalize(life.to_cells(node, origin)) == (normalize(GLIDER)[0], (100, 100))
+
+
+class TestHashLifeSimulation:
+    @pytest.mark.parametrize("generations", [0, 1, 2, 50, 1000])
+    def test_matches_set_engine(self, generations):
+        for word in ["HELLO", "monument", "blunt", "A", ""] + seed_words(20):
+            expected = run_game(word, generations, use_cache=False)
+            assert run_game(word, generations, engine="hashlife", use_cache=False) == expected, word
+
+    def test_small_node_table_gives_same_result(self):
+        assert HashLifeSimulation("HELLO", max_nodes=100).run() == run_game("HELLO", use_cache=False)
+
+    def test_million_generations_score_is_exact(self):
+        # OpenAI sheds gliders and never repeats; once its population settles into a cycle the
+        # score for a million generations follows from the set engine's first few thousand.
+        simulation = Simulation("OpenAI", 2000)
+        populations = [simulation.population()]
+        for _ in simulation.steps():
+            populations.append(simulation.population())
+        tail = populations[-100:]
+        cycle = next(length for length in range(1, 50) if tail[length:] == tail[:-length])
+
+        generations = 10 ** 6
+        start = len(populations) - cycle
+        whole, extra = divmod(generations - start, cycle)
+        expected = sum(populations[:start]) + whole * sum(populations[start:]) + sum(populations[start:start + extra])
+
+        result = run_game("OpenAI", generations, engine="hashlife", use_cache=False)
+        assert result == {"generations": generations, "score": expected, "period": None, "displacement": None}
+
+    def test_passed_deadline_raises(self):
+        with pytest.raises(SimulationTimeout):
+            run_game("OpenAI", 10 ** 6, engine="hashlife", use_cache=False, deadline=time.time() - 1)
+
+    def test_steps_not_supported(self):
+        with pytest.raises(NotImplementedError):
+            next(HashLifeSimulation("HELLO").steps())
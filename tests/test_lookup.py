@@ -0,0 +1,70 @@
+import pytest
+from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor
+from api import metrics
+from api.cgol import run_game
+from api.lookup import LookupTable, build_lookup_table, encode_key, get_lookup_table
+from build_lookup import main
+
+WORDS = ["monument", "blunt", "HELLO", "OpenAI", "a", "", "café"]
+
+
+@pytest.fixture
+def thread_game_executor():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        with patch("api.batch.get_game_executor", return_value=executor):
+            yield executor
+
+
+@pytest.fixture
+def table_path(tmp_path, thread_game_executor):
+    path = str(tmp_path / "lookup.bin")
+    build_lookup_table(WORDS + ["blunt", "x" * 17], path, generations=200)
+    return path
+
+
+class TestLookupTable:
+    def test_results_match_run_game(self, table_path):
+        table = LookupTable(table_path)
+        assert len(table) == len(WORDS)
+        for word in WORDS:
+            assert table.get(word, 200, "set") == run_game(word, 200, use_cache=False), word
+
+    def test_misses(self, table_path):
+        table = LookupTable(table_path)
+        assert table.get("zebra", 200, "set") is None
+        assert table.get("blun", 200, "set") is None
+        assert table.get("x" * 17, 200, "set") is None
+        assert table.get("blunt", 1000, "set") is None
+        assert table.get("blunt", 200, "set/torus") is None
+
+    def test_keys_sort_like_words(self):
+        words = ["b", "ab", "a", "abc", "aa"]
+        assert sorted(words, key=encode_key) == sorted(words)
+        assert encode_key("a\0") is None
+
+    def test_rejects_truncated_file(self, table_path):
+        with open(table_path, "rb") as file:
+            data = file.read()
+        with open(table_path, "wb") as file:
+            file.write(data[:-1])
+        with pytest.raises(ValueError, match="truncated"):
+            LookupTable(table_path)
+
+    def test_run_game_reads_the_table_first(self, table_path):
+        with patch("api.lookup.LOOKUP_PATH", table_path), patch("api.lookup._lookup_table", None):
+            hits = metrics.LOOKUP_TABLE_HITS.value()
+            with patch("api.cgol.Simulation.run") as mock_run:
+                assert run_game("OpenAI", 200) == LookupTable(table_path).get("OpenAI", 200, "set")
+            mock_run.assert_not_called()
+            assert metrics.LOOKUP_TABLE_HITS.value() == hits + 1
+            assert get_lookup_table().path == table_path
+
+    def test_cli(self, tmp_path, thread_game_executor):
+        source = tmp_path / "words.txt"
+        source.write_text("monument\nblunt\n")
+        target = tmp_path / "lookup.bin"
+        main([str(source), "-o", str(target), "--topology", "torus"])
+        table = LookupTable(str(target))
+        assert table.engine == "set/torus"
+        assert table.get("blunt", 1000, "set/torus") == run_game("blunt", topology="torus")
@@ -0,0 +1,125 @@
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+from concurrent.futures import ThreadPoolExecutor
+from fastapi.testclient import TestClient
+from api import metrics
+from api.cgol import RESULT_CACHE, run_game
+from api.main import app
+from ai_client.wrapper import client_response
+
+
+@pytest.fixture
+def histogram():
+    histogram = metrics.Histogram("test_seconds", "Test durations.", ("phase",), buckets=(0.1, 1.0))
+    yield histogram
+    metrics.REGISTRY.remove(histogram)
+
+
+@pytest.fixture
+def counter():
+    counter = metrics.Counter("test_total", "Test events.", ("result",))
+    yield counter
+    metrics.REGISTRY.remove(counter)
+
+
+class TestMetrics:
+    def test_counter_by_labels(self, counter):
+        counter.inc(result="hit")
+        counter.inc(2, result="hit")
+        counter.inc(result="miss")
+        assert counter.value(result="hit") == 3
+        assert counter.value(result="miss") == 1
+
+    def test_render_histogram_buckets_are_cumulative(self, histogram):
+        for value in (0.05, 0.5, 0.5, 2.0):
+            histogram.observe(value, phase="simulations")
+        text = metrics.render()
+        assert "# TYPE test_seconds histogram" in text
+        assert 'test_seconds_bucket{phase="simulations",le="0.1"} 1\n' in text
+        assert 'test_seconds_bucket{phase="simulations",le="1.0"} 3\n' in text
+        assert 'test_seconds_bucket{phase="simulations",le="+Inf"} 4\n' in text
+        assert 'test_seconds_sum{phase="simulations"} 3.05\n' in text
+        assert 'test_seconds_count{phase="simulations"} 4\n' in text
+
+    def test_time_observes_when_body_raises(self, histogram):
+        with pytest.raises(ValueError):
+            with histogram.time(phase="first_llm_call"):
+                raise ValueError()
+        assert histogram.count(phase="first_llm_call") == 1
+
+    def test_worker_samples_are_merged(self, counter, histogram):
+        def record():
+            counter.inc(result="hit")
+            histogram.observe(0.5, phase="simulations")
+            return "result"
+
+        with patch("api.metrics._worker_process", True):
+            result, samples = metrics.call_with_metrics(record)
+        assert result == "result"
+        assert counter.value(result="hit") == 0
+        metrics.merge_metrics(samples)
+        metrics.merge_metrics(samples)
+        assert counter.value(result="hit") == 2
+        assert histogram.count(phase="simulations") == 2
+
+    def test_outside_a_worker_samples_stay_put(self, counter):
+        result, samples = metrics.call_with_metrics(counter.inc, result="miss")
+        assert samples is None
+        assert counter.value(result="miss") == 1
+
+
+class TestInstrumentation:
+    def test_run_game_records_cache_lookups_and_work(self):
+        RESULT_CACHE.clear()
+        games = metrics.GAMES.value(engine="set/torus")
+        generations = metrics.GENERATIONS.value(engine="set/torus")
+        cells = metrics.CELLS.value(engine="set/torus")
+        hits, misses = metrics.CACHE_LOOKUPS.value(result="hit"), metrics.CACHE_LOOKUPS.value(result="miss")
+
+        result = run_game("monument", topology="torus")
+        run_game("monument", topology="torus")
+        assert metrics.GAMES.value(engine="set/torus") == games + 1
+        assert metrics.GENERATIONS.value(engine="set/torus") == generations + result["generations"]
+        assert metrics.CELLS.value(engine="set/torus") == cells + result["score"]
+        assert metrics.CACHE_LOOKUPS.value(result="hit") == hits + 1
+        assert metrics.CACHE_LOOKUPS.value(result="miss") == misses + 1
+
+    def test_client_response_times_each_phase(self):
+        function_call = MagicMock(type="function_call", arguments=json.dumps({"word": "blunt"}), call_id="blunt123")
+        function_call.name = "run_game"
+        mock_client = MagicMock()
+        mock_client.responses.create.side_effect = [MagicMock(output=[function_call]), MagicMock(output_text="done")]
+        phases = ["first_llm_call", "simulations", "followup_llm_call"]
+        before = [metrics.RESPONSE_PHASE_SECONDS.count(phase=phase) for phase in phases]
+        responses, tool_calls = metrics.RESPONSE_SECONDS.count(), metrics.TOOL_CALLS.value()
+
+        with patch("ai_client.wrapper.run_game", return_value={"generations": 5, "score": 10}):
+            client_response(mock_client, "score blunt")
+        assert [metrics.RESPONSE_PHASE_SECONDS.count(phase=phase) for phase in phases] == [count + 1 for count in before]
+        assert metrics.RESPONSE_SECONDS.count() == responses + 1
+        assert metrics.TOOL_CALLS.value() == tool_calls + 1
+
+    def test_games_in_the_executor_are_counted(self):
+        function_calls = []
+        for word in ["a", "bb"]:
+            function_call = MagicMock(type="function_call", arguments=json.dumps({"word": word}), call_id=word)
+            function_call.name = "run_game"
+            function_calls.append(function_call)
+        mock_client = MagicMock()
+        mock_client.responses.create.side_effect = [MagicMock(output=function_calls), MagicMock(output_text="done")]
+        games = metrics.GAMES.value(engine="set")
+
+        with ThreadPoolExecutor(max_workers=2) as executor, \
+                patch("ai_client.wrapper.get_game_executor", return_value=executor), \
+                patch("ai_client.wrapper.run_game", side_effect=lambda word: run_game(word, use_cache=False)):
+            client_response(mock_client, "score a and bb")
+        assert metrics.GAMES.value(engine="set") == games + 2
+
+    def test_metrics_endpoint(self):
+        run_game("blunt")
+        response = TestClient(app).get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "# TYPE cgol_response_phase_seconds histogram" in response.text
+        assert 'cgol_cache_lookups_total{result="' in response.text
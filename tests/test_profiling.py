@@ -0,0 +1,74 @@
+import json
+import pstats
+import pytest
+from unittest.mock import AsyncMock, patch
+from concurrent.futures import ThreadPoolExecutor
+from fastapi.testclient import TestClient
+from api import profiling
+from api.cgol import run_game
+from api.main import app
+
+
+@pytest.fixture
+def profile_dir(tmp_path):
+    with patch("api.profiling.PROFILE_DIR", str(tmp_path)):
+        yield tmp_path
+
+
+class TestProfiling:
+    def test_off_without_profile_dir(self, tmp_path):
+        run_game("monument", use_cache=False, profile=True)
+        assert profiling.sample_request("1") is False
+        assert list(tmp_path.iterdir()) == []
+
+    def test_pstats_profile(self, profile_dir):
+        run_game("monument", use_cache=False, profile=True)
+        [path] = profile_dir.glob("*-run_game-set.pstats")
+        functions = {function for _, _, function in pstats.Stats(str(path)).stats}
+        assert "next_generation_packed" in functions
+
+    def test_collapsed_profile(self, profile_dir):
+        with patch("api.profiling.PROFILE_MODE", "collapsed"):
+            run_game("OpenAI", 2000, use_cache=False, profile=True)
+        [path] = profile_dir.glob("*-run_game-set.folded")
+        lines = path.read_text().splitlines()
+        assert lines
+        stack, count = lines[0].rsplit(" ", 1)
+        assert ";run_game (cgol.py:" in stack and int(count) > 0
+
+    def test_profiles_do_not_nest(self, profile_dir):
+        with profiling.profiled("outer", True):
+            run_game("monument", use_cache=False, profile=True)
+        assert [path.name.split("-")[-1] for path in profile_dir.iterdir()] == ["outer.pstats"]
+
+    def test_follows_the_request_mark(self, profile_dir):
+        run_game("monument", use_cache=False)
+        token = profiling.PROFILE_REQUESTED.set(True)
+        try:
+            run_game("blunt", use_cache=False)
+        finally:
+            profiling.PROFILE_REQUESTED.reset(token)
+        assert len(list(profile_dir.iterdir())) == 1
+
+    @pytest.mark.parametrize("header, rate, expected", [("1", 0.0, True), ("0", 1.0, False), (None, 1.0, True), (None, 0.0, False)])
+    def test_sample_request(self, profile_dir, header, rate, expected):
+        with patch("api.profiling.PROFILE_RATE", rate):
+            assert profiling.sample_request(header) is expected
+
+
+class TestProfileMiddleware:
+    @patch("api.main.async_client_response", new_callable=AsyncMock)
+    def test_header_marks_the_request(self, mock_client_response, profile_dir):
+        marks = []
+        mock_client_response.side_effect = lambda *args, **kwargs: marks.append(profiling.PROFILE_REQUESTED.get()) or "done"
+        client = TestClient(app)
+        client.post("/results", data={"user_input": "score blunt"}, headers={"X-Profile": "1"})
+        client.post("/results", data={"user_input": "score blunt"})
+        assert marks == [True, False]
+
+    def test_batch_profiles_its_tasks(self, profile_dir):
+        # Spawned workers wouldn't see the patched profile directory, so run the tasks on threads
+        with ThreadPoolExecutor(max_workers=2) as executor, patch("api.batch.get_game_executor", return_value=executor):
+            response = TestClient(app).post("/batch", content="monument\nblunt", headers={"X-Profile": "true"})
+        assert [json.loads(line)["word"] for line in response.text.splitlines()] == ["monument", "blunt"]
+        assert len(list(profile_dir.glob("*-batch-set-infinite.pstats"))) == 2
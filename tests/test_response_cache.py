@@ -0,0 +1,110 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from openai import APIConnectionError
+from ai_client.response_cache import MemoryBackend, ResponseCache, SQLiteBackend, normalize_prompt
+from ai_client.wrapper import (
+    RESPONSE_CACHE,
+    ServerError,
+    async_client_response,
+    client_response,
+    response_cache_key,
+    stream_client_response,
+)
+from api import metrics
+
+ANSWER = {"text": "blunt has 42 generations", "results": [{"word": "blunt", "result": {"generations": 42, "score": 556}}]}
+
+
+def make_function_call(word: str) -> MagicMock:
+    function_call = MagicMock(type="function_call", arguments=json.dumps({"word": word}), call_id=f"{word}123")
+    function_call.name = "run_game"
+    return function_call
+
+
+def tool_calling_client(client) -> MagicMock:
+    client.responses.create.side_effect = [
+        MagicMock(output=[make_function_call("blunt")]),
+        MagicMock(output_text="**blunt** has 42 generations"),
+    ]
+    return client
+
+
+class TestBackends:
+    @pytest.mark.parametrize("make_backend", [MemoryBackend, lambda: SQLiteBackend(":memory:")])
+    def test_entries_expire(self, make_backend):
+        backend = make_backend()
+        with patch("ai_client.response_cache.time.time", return_value=1000.0):
+            backend.set("key", "value", 1010.0)
+            assert backend.get("key") == "value"
+        with patch("ai_client.response_cache.time.time", return_value=1010.0):
+            assert backend.get("key") is None
+
+    @pytest.mark.parametrize("make_backend", [MemoryBackend, SQLiteBackend])
+    def test_size_is_bounded(self, make_backend, tmp_path):
+        backend = make_backend(maxsize=2) if make_backend is MemoryBackend else make_backend(str(tmp_path / "responses.sqlite"), maxsize=2)
+        for index, key in enumerate(["a", "b", "c"]):
+            backend.set(key, key, 10**10 + index)
+        assert [backend.get(key) for key in ["a", "b", "c"]] == [None, "b", "c"]
+
+    def test_sqlite_is_shared(self, tmp_path):
+        path = str(tmp_path / "responses.sqlite")
+        ResponseCache(SQLiteBackend(path)).set("key", ANSWER)
+        assert ResponseCache(SQLiteBackend(path)).get("key") == ANSWER
+
+
+class TestResponseCache:
+    def test_near_identical_prompts_share_a_key(self):
+        assert normalize_prompt("  score the word   'blunt'?\n") == "score the word 'blunt'"
+        assert response_cache_key("score the word blunt", 5) == response_cache_key("score  the word blunt.", 5)
+
+    def test_key_keeps_case_and_context(self):
+        assert response_cache_key("score Blunt", 5) != response_cache_key("score blunt", 5)
+        assert response_cache_key("score blunt", 5) != response_cache_key("score blunt", 1)
+        key = response_cache_key("score blunt", 5)
+        with patch("ai_client.wrapper.GPT_MODEL", "gpt-4o"):
+            assert response_cache_key("score blunt", 5) != key
+
+    def test_zero_ttl_disables_caching(self):
+        cache = ResponseCache(ttl=0)
+        cache.set("key", ANSWER)
+        assert cache.get("key") is None
+
+
+@patch("ai_client.wrapper.run_game", return_value={"generations": 42, "score": 556})
+class TestCachedResponses:
+    def test_client_response_hit_skips_the_model(self, mock_run_game):
+        client = tool_calling_client(MagicMock())
+        hits = metrics.RESPONSE_CACHE_LOOKUPS.value(result="hit")
+        assert client_response(client, "score the word blunt") == "blunt has 42 generations"
+        assert client_response(client, "score the word blunt?") == "blunt has 42 generations"
+        assert client.responses.create.call_count == 2
+        mock_run_game.assert_called_once()
+        assert metrics.RESPONSE_CACHE_LOOKUPS.value(result="hit") == hits + 1
+        assert RESPONSE_CACHE.get(response_cache_key("score the word blunt", 5)) == ANSWER
+
+    def test_async_client_response_hit_skips_the_model(self, mock_run_game):
+        RESPONSE_CACHE.set(response_cache_key("score the word blunt", 5), ANSWER)
+        client = MagicMock()
+        client.responses.create = AsyncMock()
+        assert asyncio.run(async_client_response(client, "score the word blunt")) == ANSWER["text"]
+        client.responses.create.assert_not_awaited()
+
+    def test_stream_hit_replays_results(self, mock_run_game):
+        RESPONSE_CACHE.set(response_cache_key("score the word blunt", 5), ANSWER)
+        client = MagicMock()
+        client.responses.create = AsyncMock()
+
+        async def collect():
+            return [event async for event in stream_client_response(client, "score the word blunt")]
+
+        assert asyncio.run(collect()) == [("result", ANSWER["results"][0]), ("token", ANSWER["text"])]
+        client.responses.create.assert_not_awaited()
+
+    def test_failures_are_not_cached(self, mock_run_game):
+        client = MagicMock()
+        client.responses.create.side_effect = APIConnectionError(request=MagicMock())
+        with pytest.raises(ServerError):
+            client_response(client, "score the word blunt")
+        assert RESPONSE_CACHE.get(response_cache_key("score the word blunt", 5)) is None
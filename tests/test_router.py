@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from ai_client.router import format_answer, parse_prompt
+from ai_client.wrapper import async_client_response, client_response, stream_client_response
+from api import metrics
+from api.cgol import run_game
+
+
+@pytest.fixture
+def local_router():
+    with patch("ai_client.wrapper.LOCAL_ROUTER", True):
+        yield
+
+
+class TestParsePrompt:
+    @pytest.mark.parametrize("prompt, expected", [
+        ("score monument", ("score", ["monument"])),
+        ("Score the word \"OpenAI\"?", ("score", ["OpenAI"])),
+        ("what is the score of blunt", ("score", ["blunt"])),
+        ("what does monument score", ("score", ["monument"])),
+        ("generations for foo and bar", ("generations", ["foo", "bar"])),
+        ("how many generations do foo and bar have?", ("generations", ["foo", "bar"])),
+        ("generations and score for Cat, dog, and fish.", ("both", ["Cat", "dog", "fish"])),
+        ("score 'salt and pepper' and 'it'", ("score", ["salt and pepper", "it"])),
+    ])
+    def test_simple_prompts(self, prompt, expected):
+        assert parse_prompt(prompt) == expected
+
+    @pytest.mark.parametrize("prompt", [
+        "give me data on the word blunt",
+        "score every word in the dictionary",
+        "score foo, then a word like it",
+        "score it",
+        "score something",
+        "score five random words",
+        "score",
+        "hi",
+        "score " + " and ".join(["a"] * 21),
+    ])
+    def test_other_prompts_go_to_the_llm(self, prompt):
+        assert parse_prompt(prompt) is None
+
+    def test_format_answer(self):
+        results = [{"generations": 13, "score": 223}, {"generations": 42, "score": 556}]
+        assert format_answer("both", ["monument", "blunt"], results) == (
+            'The word "monument" runs for 13 generations and has a score of 223.\n'
+            'The word "blunt" runs for 42 generations and has a score of 556.'
+        )
+        assert format_answer("score", ["monument"], results) == 'The word "monument" has a score of 223.'
+
+
+@pytest.mark.usefixtures("local_router")
+class TestRoutedResponses:
+    def test_client_response_skips_the_model(self):
+        client = MagicMock()
+        routed = metrics.ROUTED_PROMPTS.value()
+        answer = client_response(client, "how many generations does blunt have?")
+        assert answer == f'The word "blunt" runs for {run_game("blunt")["generations"]} generations.'
+        client.responses.create.assert_not_called()
+        assert metrics.ROUTED_PROMPTS.value() == routed + 1
+
+    def test_async_client_response_skips_the_model(self):
+        client = MagicMock()
+        client.responses.create = AsyncMock()
+        answer = asyncio.run(async_client_response(client, "score monument"))
+        assert answer == f'The word "monument" has a score of {run_game("monument")["score"]}.'
+        client.responses.create.assert_not_awaited()
+
+    def test_stream_sends_results_then_the_answer(self):
+        client = MagicMock()
+        client.responses.create = AsyncMock()
+
+        async def collect():
+            return [event async for event in stream_client_response(client, "score monument and blunt")]
+
+        events = asyncio.run(collect())
+        assert sorted(data["word"] for event, data in events[:2]) == ["blunt", "monument"]
+        assert events[2] == ("token", format_answer("score", ["monument", "blunt"], [run_game("monument"), run_game("blunt")]))
+        client.responses.create.assert_not_awaited()
+
+    def test_unparsed_prompts_use_the_model(self):
+        client = MagicMock()
+        client.responses.create.return_value = MagicMock(output=[], output_text="Which word?")
+        assert client_response(client, "score it") == "Which word?"
+        client.responses.create.assert_called_once()
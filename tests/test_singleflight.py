@@ -0,0 +1,164 @@
+import asyncio
+import threading
+import time
+import pytest
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from unittest.mock import patch
+from ai_client.wrapper import iter_game_results, run_words
+from api import metrics
+from api.cgol import GAME_FLIGHTS, SimulationTimeout, run_game
+from api.singleflight import SingleFlight
+
+RESULT = {"generations": 7, "score": 70}
+
+
+def run_concurrently(function, *argument_lists):
+    with ThreadPoolExecutor(max_workers=len(argument_lists)) as executor:
+        futures = [executor.submit(function, *arguments) for arguments in argument_lists]
+        return [future.result() for future in futures]
+
+
+class TestSingleFlight:
+    def test_followers_share_the_leaders_result(self):
+        flight = SingleFlight("test")
+        coalesced = metrics.SINGLE_FLIGHT_CALLS.value(flight="test", result="coalesced")
+        future, leader = flight.join("key")
+        assert leader
+        follower, leader = flight.join("key")
+        assert follower is future and not leader
+        assert flight.run("key", future, lambda: RESULT) == RESULT
+        assert follower.result() == RESULT
+        assert len(flight) == 0
+        assert flight.join("key")[1]
+        assert metrics.SINGLE_FLIGHT_CALLS.value(flight="test", result="coalesced") == coalesced + 1
+
+    def test_followers_share_the_leaders_exception(self):
+        flight = SingleFlight("test")
+        future, _ = flight.join("key")
+        with pytest.raises(ZeroDivisionError):
+            flight.run("key", future, lambda: 1 / 0)
+        with pytest.raises(ZeroDivisionError):
+            future.result()
+
+    def test_follow_shares_a_task(self):
+        flight = SingleFlight("test")
+        future, _ = flight.join("key")
+        task = Future()
+        flight.follow("key", future, task, lambda result: result["score"])
+        task.set_result(RESULT)
+        assert future.result() == 70
+        assert len(flight) == 0
+
+        future, _ = flight.join("key")
+        task = Future()
+        flight.follow("key", future, task)
+        task.cancel()
+        assert future.cancelled()
+
+
+class TestRunGame:
+    def test_concurrent_calls_simulate_once(self):
+        def slow_game(*args, **kwargs):
+            time.sleep(0.2)
+            return RESULT
+
+        with patch("api.cgol.simulate_game", side_effect=slow_game) as mock_simulate:
+            results = run_concurrently(run_game, *[("trending",)] * 4)
+        assert results == [RESULT] * 4
+        mock_simulate.assert_called_once()
+        assert len(GAME_FLIGHTS) == 0
+
+    def test_uncached_calls_are_not_shared(self):
+        with patch("api.cgol.simulate_game", return_value=RESULT) as mock_simulate:
+            run_concurrently(run_game, ("trending", 1000, "set", False), ("trending", 1000, "set", False))
+        assert mock_simulate.call_count == 2
+
+    def test_follower_reruns_a_game_abandoned_at_the_leaders_deadline(self):
+        started = threading.Event()
+
+        def game(*args, **kwargs):
+            if not started.is_set():
+                started.set()
+                time.sleep(0.2)
+                raise SimulationTimeout()
+            return RESULT
+
+        def follower():
+            started.wait()
+            return run_game("trending")
+
+        def leader():
+            with pytest.raises(SimulationTimeout):
+                run_game("trending", deadline=time.time() + 0.1)
+
+        with patch("api.cgol.simulate_game", side_effect=game) as mock_simulate:
+            results = run_concurrently(lambda task: task(), (leader,), (follower,))
+        assert results[1] == RESULT
+        assert mock_simulate.call_count == 2
+
+    def test_follower_stops_waiting_at_its_own_deadline(self):
+        def slow_game(*args, **kwargs):
+            time.sleep(0.3)
+            return RESULT
+
+        def follower():
+            time.sleep(0.05)
+            with pytest.raises(SimulationTimeout):
+                run_game("trending", deadline=time.time() + 0.05)
+            return time.time()
+
+        with patch("api.cgol.simulate_game", side_effect=slow_game):
+            started = time.time()
+            results = run_concurrently(lambda task: task(), (lambda: run_game("trending"),), (follower,))
+        assert results[0] == RESULT
+        assert results[1] - started < 0.25
+
+
+@pytest.fixture
+def slow_games():
+    played = []
+
+    def slow_game(word, **kwargs):
+        played.append(word)
+        time.sleep(0.2)
+        return {"generations": len(word), "score": 1}
+
+    with ThreadPoolExecutor(max_workers=4) as executor, \
+            patch("ai_client.wrapper.get_game_executor", return_value=executor), \
+            patch("ai_client.wrapper.run_game", side_effect=slow_game):
+        yield played
+
+
+class TestWrapper:
+    def test_concurrent_requests_share_pool_games(self, slow_games):
+        results = run_concurrently(run_words, (["foo", "trending"],), (["trending", "bar"],))
+        assert results == [
+            [{"generations": 3, "score": 1}, {"generations": 8, "score": 1}],
+            [{"generations": 8, "score": 1}, {"generations": 3, "score": 1}],
+        ]
+        assert sorted(slow_games) == ["bar", "foo", "trending"]
+
+    def test_async_requests_share_pool_games(self, slow_games):
+        async def collect(words):
+            return sorted([(word, result) async for _, word, result in iter_game_results(words)])
+
+        async def main():
+            return await asyncio.gather(collect(["foo", "trending"]), collect(["trending", "bar"]))
+
+        first, second = asyncio.run(main())
+        assert first[1] == second[1] == ("trending", {"generations": 8, "score": 1})
+        assert sorted(slow_games) == ["bar", "foo", "trending"]
+
+    def test_cancelled_shared_game_is_rerun(self, slow_games):
+        def cancelled_then_rerun():
+            future, _ = GAME_FLIGHTS.join(("trending", 1000, "set"))
+            time.sleep(0.05)
+            future.cancel()
+            GAME_FLIGHTS._forget(("trending", 1000, "set"), future)
+
+        thread = threading.Thread(target=cancelled_then_rerun)
+        thread.start()
+        time.sleep(0.01)
+        assert run_words(["foo", "trending"]) == [{"generations": 3, "score": 1}, {"generations": 8, "score": 1}]
+        thread.join()
+        assert sorted(slow_games) == ["foo", "trending"]